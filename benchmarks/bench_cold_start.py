@@ -0,0 +1,147 @@
+"""Report import time and cold-start cost of the app and worker entry points.
+
+Each target runs in a fresh interpreter, so nothing is shared between
+measurements. Run from the project root:
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --check       # exit 1 when over budget
+    python -m benchmarks.bench_cold_start --importtime  # slowest imports per target
+"""
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Optional dependencies that must only load when their feature is used
+HEAVY_MODULES = (
+    "numpy", "pandas", "plotly", "openai", "psutil", "speech_recognition", "pyttsx3"
+)
+
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed_ms": elapsed * 1000,
+    "loaded": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+def app_imports(app_path=PROJECT_ROOT / "streamlit_app.py"):
+    """Return the top-level imports of the Streamlit app as source lines"""
+    tree = ast.parse(Path(app_path).read_text(encoding='utf-8'))
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+    return "\n".join(lines)
+
+def targets():
+    """(name, code, budget_ms, forbidden modules) for every measured entry point"""
+    return [
+        ("app first paint", app_imports() + "\nJarvisAI()\nConversationManager()", 1500, HEAVY_MODULES),
+        ("command server worker",
+         "from modules.command_server import CommandServer\nCommandServer()", 300, HEAVY_MODULES),
+        ("jarvis engine", "from modules.jarvis_ai import JarvisAI\nJarvisAI()", 150, HEAVY_MODULES),
+        ("system monitor",
+         "from modules.system_control import SystemController\nSystemController().get_system_status()",
+         1000, ("pandas", "plotly", "openai", "speech_recognition", "pyttsx3")),
+        ("speech handler", "import modules.speech_handler", 2000, ("pyttsx3", "pandas", "openai"))
+    ]
+
+def measure(code, importtime=False):
+    """Run code in a fresh interpreter; return its timings and loaded heavy modules"""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD_TEMPLATE.format(code=code, heavy=HEAVY_MODULES)]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed"}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = wall_ms
+    if importtime:
+        result["slowest_imports"] = parse_importtime(completed.stderr)
+    return result
+
+def parse_importtime(output, top=8):
+    """Return the top-level packages with the largest cumulative import time"""
+    totals = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        root = name.split(".")[0]
+        # A package's own line is its largest cumulative figure
+        totals[root] = max(totals.get(root, 0), int(cumulative))
+    slowest = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [(name, round(micros / 1000, 1)) for name, micros in slowest]
+
+def run(repeat=3, importtime=False, as_json=False):
+    """Measure every target, keeping the fastest of repeat runs; return the failures"""
+    report = []
+    failures = []
+    # Streamlit pulls some of these in itself (e.g. plotly for its chart theme)
+    framework = set(measure("import streamlit").get("loaded", []))
+    for name, code, budget_ms, forbidden in targets():
+        runs = [measure(code) for _ in range(repeat)]
+        errors = [r for r in runs if "error" in r]
+        if errors:
+            entry = {"target": name, "error": errors[0]["error"]}
+            failures.append(f"{name}: {entry['error']}")
+            report.append(entry)
+            continue
+        best = min(runs, key=lambda r: r["wall_ms"])
+        entry = {
+            "target": name,
+            "wall_ms": round(best["wall_ms"], 1),
+            "import_ms": round(best["elapsed_ms"], 1),
+            "budget_ms": budget_ms,
+            "loaded": best["loaded"]
+        }
+        if importtime:
+            entry["slowest_imports"] = measure(code, importtime=True).get("slowest_imports", [])
+        eager = sorted(set(best["loaded"]) & set(forbidden) - framework)
+        if entry["wall_ms"] > budget_ms:
+            failures.append(f"{name}: {entry['wall_ms']}ms over the {budget_ms}ms budget")
+        if eager:
+            failures.append(f"{name}: loads {', '.join(eager)} eagerly")
+        report.append(entry)
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'target':<24} {'wall ms':>8} {'import ms':>10} {'budget':>7}  heavy modules loaded")
+        for entry in report:
+            if "error" in entry:
+                print(f"{entry['target']:<24} error: {entry['error']}")
+                continue
+            print(f"{entry['target']:<24} {entry['wall_ms']:>8.1f} {entry['import_ms']:>10.1f} "
+                  f"{entry['budget_ms']:>7}  {', '.join(entry['loaded']) or '-'}")
+            for module, millis in entry.get("slowest_imports", []):
+                print(f"{'':<26}{module:<22} {millis:>8.1f} ms")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start and import-time report")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh runs per target; the fastest is kept")
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports per target")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any target misses its budget")
+    args = parser.parse_args()
+    failures = run(args.repeat, args.importtime, args.json)
+    if args.check and failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
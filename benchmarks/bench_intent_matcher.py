@@ -0,0 +1,76 @@
+"""Compare the compiled intent matcher against the legacy keyword loop.
+
+Run from the project root:
+    python -m benchmarks.bench_intent_matcher
+"""
+
+import random
+import time
+
+from modules.intent_matcher import INTENT_ALIASES, IntentMatcher
+from modules.jarvis_ai import JarvisAI
+
+BASE_COMMANDS = {group: list(keywords) for group, keywords in JarvisAI().commands_db.items()}
+
+SAMPLE_COMMANDS = [
+    "What time is it?",
+    "What's today's date?",
+    "Tell me the weather",
+    "Open calculator",
+    "Calculate 15 + 25",
+    "What's 100 / 4?",
+    "Open google-chrome",
+    "Remind me 10/18",
+    "Tell me a joke",
+    "Goodbye for now",
+    "Can you summarise the quarterly report for me please",
+    "this is a sentence that matches nothing in particular at all"
+]
+
+def legacy_classify(commands_db, command):
+    """The original first-hit substring loop from JarvisAI.classify_intent"""
+    for intent, keywords in commands_db.items():
+        if any(keyword in command for keyword in keywords):
+            return intent
+    return "unknown"
+
+def build_vocabulary(extra_phrases, seed=42):
+    """Extend the base commands with synthetic filler phrases"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    commands_db = {group: list(keywords) for group, keywords in BASE_COMMANDS.items()}
+    groups = list(commands_db)
+    for _ in range(extra_phrases):
+        words = ["".join(rng.choice(letters) for _ in range(rng.randint(5, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        commands_db[rng.choice(groups)].append(" ".join(words))
+    return commands_db
+
+def time_per_call(func, commands, repeat):
+    """Return the mean time per call in microseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for command in commands:
+            func(command)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(commands)) * 1e6
+
+def run(vocabulary_sizes=(0, 1000, 5000), repeat=200):
+    commands = [command.lower() for command in SAMPLE_COMMANDS]
+    print(f"{'phrases':>8} {'legacy us':>10} {'matcher us':>11} {'speedup':>8}")
+    for extra in vocabulary_sizes:
+        commands_db = build_vocabulary(extra)
+        matcher = IntentMatcher.from_sources(commands_db)
+        legacy = time_per_call(lambda c: legacy_classify(commands_db, c), commands, repeat)
+        compiled = time_per_call(matcher.classify, commands, repeat)
+        print(f"{matcher.phrase_count:>8} {legacy:>10.2f} {compiled:>11.2f} {legacy / compiled:>7.1f}x")
+
+    matcher = IntentMatcher.from_sources(BASE_COMMANDS)
+    print("\nIntent changes on sample commands (legacy -> matcher):")
+    for command in commands:
+        legacy = legacy_classify(BASE_COMMANDS, command)
+        legacy = INTENT_ALIASES.get(legacy, legacy)
+        print(f"  {command!r}: {legacy} -> {matcher.classify(command)}")
+
+if __name__ == "__main__":
+    run()
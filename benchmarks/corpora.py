@@ -0,0 +1,153 @@
+"""Deterministic synthetic inputs for the benchmark suite.
+
+Every generator takes a seed, so two runs (or two machines) time exactly
+the same commands, histories and process tables.
+"""
+
+import datetime
+import random
+
+COMMAND_TEMPLATES = [
+    "hello jarvis",
+    "good morning",
+    "what time is it",
+    "what's the date today",
+    "tell me the weather in {city}",
+    "what's the temperature in {city}",
+    "open calculator",
+    "launch notepad",
+    "calculate {a} + {b}",
+    "compute {a} * {b} - {c}",
+    "what is ({a} + {b}) / {c}",
+    "tell me a joke",
+    "something funny please",
+    "goodbye",
+    "see you later",
+    "summarise the quarterly report for {city}",
+    "remind me to call {name} tomorrow",
+    "remind me {month}/{day}",
+    "open google-chrome",
+    "what's {a} / {c}",
+    "play some music by {name}"
+]
+
+CITIES = ["london", "paris", "tokyo", "new york", "sydney", "berlin", "toronto", "mumbai"]
+NAMES = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi"]
+
+UNSAFE_FRAGMENTS = [
+    "<script>alert(1)</script>", "rm -rf /", "del *.*", "format c:", "shutdown -r now",
+    "a | b", "`whoami`", "x; y", "'quoted' & \"double\""
+]
+
+PROCESS_NAMES = [
+    "python", "chrome", "code", "postgres", "nginx", "systemd", "bash", "node",
+    "java", "dockerd", "sshd", "Xorg", "pulseaudio", "slack", "zoom", "firefox"
+]
+
+def _fill(template, rng):
+    return template.format(
+        city=rng.choice(CITIES),
+        name=rng.choice(NAMES),
+        a=rng.randint(1, 999),
+        b=rng.randint(1, 999),
+        c=rng.randint(1, 99),
+        month=rng.randint(1, 12),
+        day=rng.randint(1, 28)
+    )
+
+def commands(count=2000, seed=1):
+    """Mixed user commands covering every intent plus unknown ones"""
+    rng = random.Random(seed)
+    return [_fill(rng.choice(COMMAND_TEMPLATES), rng) for _ in range(count)]
+
+def calculations(count=500, seed=2):
+    """Calculation requests, including a few invalid or oversized ones"""
+    rng = random.Random(seed)
+    operators = ["+", "-", "*", "/"]
+    results = []
+    for i in range(count):
+        if i % 50 == 0:
+            results.append("calculate 9 ** 99999")
+        elif i % 25 == 0:
+            results.append("calculate 1 / 0")
+        else:
+            terms = [str(rng.randint(1, 10000)) for _ in range(rng.randint(2, 6))]
+            expression = terms[0]
+            for term in terms[1:]:
+                expression += f" {rng.choice(operators)} {term}"
+            results.append(f"calculate {expression}")
+    return results
+
+def user_inputs(count=5000, seed=3):
+    """Raw text input, about one in ten carrying unsafe characters or keywords"""
+    rng = random.Random(seed)
+    base = commands(count, seed)
+    results = []
+    for text in base:
+        if rng.random() < 0.1:
+            text = f"{text} {rng.choice(UNSAFE_FRAGMENTS)}"
+        if rng.random() < 0.05:
+            text = text * 40
+        results.append(text)
+    return results
+
+def conversations(count, seed=4, start=datetime.datetime(2024, 1, 1)):
+    """Conversation records one minute apart, shaped like ConversationManager's"""
+    rng = random.Random(seed)
+    records = []
+    for i, command in enumerate(commands(count, seed)):
+        records.append({
+            "timestamp": (start + datetime.timedelta(minutes=i)).isoformat(),
+            "user_input": command,
+            "ai_response": f"Response {i} about {rng.choice(CITIES)} for {rng.choice(NAMES)}"
+        })
+    return records
+
+class SyntheticProcess:
+    """Stands in for psutil.Process with fixed CPU and memory readings"""
+
+    def __init__(self, pid, name, cpu_percent, rss):
+        self.pid = pid
+        self._name = name
+        self._cpu_percent = cpu_percent
+        self._rss = rss
+
+    def name(self):
+        return self._name
+
+    def cpu_percent(self, interval=None):
+        return self._cpu_percent
+
+    def memory_info(self):
+        return _MemoryInfo(self._rss)
+
+    def oneshot(self):
+        return _NullContext()
+
+class _MemoryInfo:
+    __slots__ = ('rss',)
+
+    def __init__(self, rss):
+        self.rss = rss
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def process_table(count=500, seed=5):
+    """A {pid: SyntheticProcess} table with a long tail of idle processes"""
+    rng = random.Random(seed)
+    table = {}
+    for i in range(count):
+        pid = 1000 + i * 7
+        busy = rng.random() < 0.1
+        table[pid] = SyntheticProcess(
+            pid,
+            rng.choice(PROCESS_NAMES),
+            round(rng.uniform(5, 100) if busy else rng.uniform(0, 0.5), 1),
+            rng.randint(1, 4000) * 1024 * 1024
+        )
+    return table
@@ -0,0 +1,276 @@
+"""Benchmark suite for the engine, storage and system layers.
+
+Run from the project root:
+    python -m benchmarks.suite                       # run, write JSON, compare to baseline
+    python -m benchmarks.suite --save-baseline       # store this run as the new baseline
+    python -m benchmarks.suite --filter storage --quick
+
+Results go to benchmarks/results/latest.json. When benchmarks/baseline.json
+exists, any case whose median time per operation grew by more than
+--threshold (default 20%) is reported and the command exits with status 1.
+Baselines only compare meaningfully on the same machine.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import corpora
+from modules.conversation_log import ConversationLog
+from modules.jarvis_ai import JarvisAI
+from modules.utils import ConversationManager, sanitize_input, validate_command
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_RESULTS = BENCHMARK_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+HISTORY_SIZES = (100, 1000, 10000)
+
+class Case:
+    """One benchmark: setup() returns a callable that performs ops operations"""
+
+    def __init__(self, name, setup, ops, rounds=None):
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+        self.rounds = rounds
+
+@contextlib.contextmanager
+def scratch_directory():
+    """Run inside a temporary working directory so real data/ is never touched"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="jarvis-bench-") as directory:
+        os.chdir(directory)
+        try:
+            yield Path(directory)
+        finally:
+            os.chdir(previous)
+
+# Engine
+
+def engine_cases():
+    jarvis = JarvisAI()
+    commands = corpora.commands()
+    lowered = [command.lower().strip() for command in commands]
+    calculations = corpora.calculations()
+
+    def classify():
+        for command in lowered:
+            jarvis.classify_intent(command)
+
+    def process():
+        random.seed(0)
+        for command in commands:
+            jarvis.process_command(command)
+
+    def calculate():
+        for command in calculations:
+            jarvis.handle_calculation(command)
+
+    return [
+        Case("engine.classify_intent", lambda: classify, len(lowered)),
+        Case("engine.process_command", lambda: process, len(commands)),
+        Case("engine.handle_calculation", lambda: calculate, len(calculations))
+    ]
+
+# Storage
+
+def prefilled_manager(directory, size):
+    """A ConversationManager whose log already holds size records"""
+    log_dir = directory / f"log-{size}"
+    log = ConversationLog(log_dir, max_records=size)
+    for record in corpora.conversations(size):
+        log.append(record)
+    log.close()
+    return ConversationManager(max_history=size, log_dir=log_dir)
+
+def storage_cases(directory, sizes=HISTORY_SIZES, appends=500):
+    cases = []
+    new_records = corpora.conversations(appends, seed=6)
+    for size in sizes:
+        def add_setup(size=size):
+            manager = prefilled_manager(directory, size)
+
+            def add():
+                for record in new_records:
+                    manager.add_conversation(record["user_input"], record["ai_response"])
+                manager.save_history()
+            return add
+
+        def load_setup(size=size):
+            manager = prefilled_manager(directory, size)
+            return manager.load_history
+
+        cases.append(Case(f"storage.add_conversation[{size}]", add_setup, appends))
+        cases.append(Case(f"storage.load_history[{size}]", load_setup, 1))
+    return cases
+
+# Input validation
+
+def validation_cases():
+    inputs = corpora.user_inputs()
+
+    def sanitize():
+        for text in inputs:
+            sanitize_input(text)
+
+    def validate():
+        for text in inputs:
+            validate_command(text)
+
+    return [
+        Case("utils.sanitize_input", lambda: sanitize, len(inputs)),
+        Case("utils.validate_command", lambda: validate, len(inputs))
+    ]
+
+# System
+
+def system_cases():
+    from modules.process_monitor import ProcessMonitor
+    from modules.system_control import SystemController
+
+    class SyntheticProcessMonitor(ProcessMonitor):
+        """ProcessMonitor over a fixed table instead of the live process list"""
+
+        def __init__(self, table):
+            super().__init__()
+            self._processes = dict(table)
+            # The table's CPU values are already deltas
+            self.baseline_at = 0.0
+
+        def refresh(self):
+            pass
+
+    controller = SystemController()
+    controller.sampler.sample_now()
+
+    def status():
+        for _ in range(200):
+            controller.get_system_status()
+
+    def live_processes():
+        controller.get_running_processes(10, "cpu")
+
+    def synthetic_top(size, sort_by):
+        monitor = SyntheticProcessMonitor(corpora.process_table(size))
+
+        def top():
+            for _ in range(20):
+                monitor.top(10, sort_by)
+        return top
+
+    cases = [
+        Case("system.get_system_status", lambda: status, 200),
+        Case("system.get_running_processes[live]", lambda: live_processes, 1)
+    ]
+    for size in (500, 5000):
+        for sort_by in ("cpu", "rss"):
+            cases.append(Case(
+                f"system.process_top[{size},{sort_by}]",
+                lambda size=size, sort_by=sort_by: synthetic_top(size, sort_by), 20
+            ))
+    return cases
+
+# Runner
+
+def measure(case, rounds):
+    """Return per-operation timings in microseconds over several rounds"""
+    func = case.setup()
+    func()  # warm-up round: caches, lazy imports, page cache
+    timings = []
+    for _ in range(case.rounds or rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) / case.ops * 1e6)
+    return {
+        "median_us": round(statistics.median(timings), 3),
+        "min_us": round(min(timings), 3),
+        "max_us": round(max(timings), 3),
+        "ops": case.ops,
+        "rounds": len(timings)
+    }
+
+def run(name_filter=None, rounds=5, quick=False):
+    """Run the selected cases and return the results document"""
+    results = {}
+    with scratch_directory() as directory:
+        sizes = HISTORY_SIZES[:2] if quick else HISTORY_SIZES
+        groups = [engine_cases, lambda: storage_cases(directory, sizes), validation_cases, system_cases]
+        for build in groups:
+            for case in build():
+                if name_filter and name_filter not in case.name:
+                    continue
+                results[case.name] = measure(case, rounds)
+                print(f"{case.name:<40} {results[case.name]['median_us']:>12.2f} us/op")
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "rounds": rounds
+        },
+        "results": results
+    }
+
+def compare(current, baseline, threshold=0.2):
+    """Return (name, baseline_us, current_us, change) for cases slower than the threshold"""
+    regressions = []
+    print(f"\n{'case':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<40} {'-':>12} {result['median_us']:>12.2f} {'new':>8}")
+            continue
+        change = result["median_us"] / previous["median_us"] - 1 if previous["median_us"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<40} {previous['median_us']:>12.2f} {result['median_us']:>12.2f} {change:>+7.0%}{flag}")
+        if change > threshold:
+            regressions.append((name, previous["median_us"], result["median_us"], change))
+    return regressions
+
+def write_json(path, document):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="JARVIS benchmark suite")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per case; the median is reported")
+    parser.add_argument("--quick", action="store_true", help="two rounds and smaller history sizes")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="where to write this run's JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 for 20%%")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    current = run(args.filter, 2 if args.quick else args.rounds, args.quick)
+    write_json(args.output, current)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, current)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not Path(args.baseline).exists():
+        print("No baseline yet; run with --save-baseline to create one")
+        return
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import collections
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import threading
+import wave
+from pathlib import Path
+
+CANNED_PHRASE_FILES = ("config/commands.json", "data/sample_responses.json")
+
+def _collect_strings(value, phrases):
+    if isinstance(value, str):
+        phrases.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_strings(item, phrases)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, phrases)
+
+def load_canned_phrases(paths=CANNED_PHRASE_FILES):
+    """Collect the fixed responses JARVIS speaks from the config and data files"""
+    phrases = []
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            continue
+        # commands.json also holds command phrase lists, which are never spoken
+        _collect_strings(config.get("responses", config), phrases)
+    return list(dict.fromkeys(phrases))
+
+class WavPlayback:
+    """An audio file playing on the platform's built-in player; stop() works from any thread"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._process = None
+        self._stopped = threading.Event()
+        if platform.system() == "Windows":
+            import winsound
+            # SND_ASYNC returns at once and PlaySound(None, 0) cuts it off
+            with wave.open(self.path, 'rb') as wav:
+                self._seconds = wav.getnframes() / wav.getframerate()
+            winsound.PlaySound(self.path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        elif platform.system() == "Darwin":
+            self._process = subprocess.Popen(["afplay", self.path])
+        else:
+            self._process = subprocess.Popen(["aplay", "-q", self.path])
+
+    def wait(self):
+        """Block until playback ends or is stopped; raises if the player failed"""
+        if self._process is None:
+            # Asynchronous winsound has no completion signal; wait out the file's length
+            self._stopped.wait(self._seconds)
+            return
+        returncode = self._process.wait()
+        if returncode != 0 and not self._stopped.is_set():
+            raise subprocess.CalledProcessError(returncode, self._process.args)
+
+    def stop(self):
+        self._stopped.set()
+        if self._process is None:
+            import winsound
+            winsound.PlaySound(None, 0)
+        elif self._process.poll() is None:
+            self._process.terminate()
+
+class AudioCache:
+    """Disk-backed cache of rendered speech with LRU eviction by total bytes"""
+
+    def __init__(self, cache_dir="data/tts_cache", max_bytes=50 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild LRU order from file access times left by earlier runs"""
+        if not self.cache_dir.exists():
+            return
+        files = sorted(self.cache_dir.glob("*.wav"), key=lambda path: path.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self.total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def key(text, rate, volume, voice_id):
+        """Cache key for a phrase rendered with the given voice settings"""
+        raw = json.dumps([text, rate, round(float(volume), 3), voice_id])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return self.cache_dir / f"{key}.wav"
+
+    def get(self, key):
+        """Return the cached file for key, or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.total_bytes -= self._entries.pop(key, 0)
+            return None
+        return path
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def temp_path_for(self, key):
+        """Path to render into before put() publishes the file"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self.cache_dir / f"{key}.tmp"
+
+    def put(self, key, rendered_path):
+        """Publish a rendered file under key and evict old entries"""
+        rendered_path = Path(rendered_path)
+        if not rendered_path.exists() or rendered_path.stat().st_size == 0:
+            return None
+        size = rendered_path.stat().st_size
+        path = self.path_for(key)
+        os.replace(rendered_path, path)
+        with self._lock:
+            self.total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,339 @@
+import collections
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+from modules.voice_activity import VoiceActivityDetector
+
+class AudioRingBuffer:
+    """Preallocated int16 ring whose recent samples are always readable as one contiguous view
+
+    Each write lands twice, at pos and pos + capacity, so any window of up
+    to capacity samples is a plain slice of the backing array: readers get
+    NumPy views (and memoryviews) without copying or reassembling a wrap.
+    """
+
+    def __init__(self, capacity, sample_rate):
+        self.capacity = int(capacity)
+        self.sample_rate = sample_rate
+        self._data = np.zeros(2 * self.capacity, dtype=np.int16)
+        self.written = 0
+
+    @classmethod
+    def from_samples(cls, samples, sample_rate):
+        """A buffer holding exactly the given samples, e.g. a whole WAV file"""
+        buffer = cls(max(len(samples), 1), sample_rate)
+        buffer.write(samples)
+        return buffer
+
+    @property
+    def oldest(self):
+        """Absolute index of the oldest sample still held"""
+        return max(self.written - self.capacity, 0)
+
+    def write(self, samples):
+        """Append samples (an int16 array or raw little-endian bytes)"""
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        position = self.written % self.capacity
+        count = len(samples)
+        first = min(count, self.capacity - position)
+        # Primary copy, wrapping at capacity, and its mirror one capacity later
+        self._data[position:position + first] = samples[:first]
+        self._data[:count - first] = samples[first:]
+        self._data[self.capacity + position:self.capacity + position + first] = samples[:first]
+        self._data[self.capacity:self.capacity + count - first] = samples[first:]
+        self.written += count
+
+    def view(self, start, end):
+        """Zero-copy int16 view of absolute samples [start, end)"""
+        if start < self.oldest or end > self.written or end < start:
+            raise IndexError("samples are no longer (or not yet) in the buffer")
+        offset = start % self.capacity
+        return self._data[offset:offset + end - start]
+
+class AudioSegment:
+    """An utterance as a window into an AudioRingBuffer; nothing is copied until audio_data()"""
+    __slots__ = ('buffer', 'start', 'end', 'captured_at')
+
+    def __init__(self, buffer, start, end, captured_at=None):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.captured_at = time.monotonic() if captured_at is None else captured_at
+
+    @classmethod
+    def from_samples(cls, samples, sample_rate):
+        return cls(AudioRingBuffer.from_samples(samples, sample_rate), 0, len(samples))
+
+    @property
+    def sample_rate(self):
+        return self.buffer.sample_rate
+
+    @property
+    def duration(self):
+        return (self.end - self.start) / self.buffer.sample_rate
+
+    @property
+    def samples(self):
+        return self.buffer.view(self.start, self.end)
+
+    def valid(self):
+        """False once the ring has overwritten the start of this segment"""
+        return self.start >= self.buffer.oldest
+
+    def memoryview(self):
+        return memoryview(self.samples)
+
+    def after(self, seconds):
+        """The rest of the segment after an offset, sharing the same buffer"""
+        start = min(self.start + int(seconds * self.sample_rate), self.end)
+        return AudioSegment(self.buffer, start, self.end, self.captured_at)
+
+    def audio_data(self):
+        """speech_recognition AudioData for recognizer backends (the only copy made)"""
+        return sr.AudioData(self.samples.tobytes(), self.sample_rate, 2)
+
+class MicrophoneSource:
+    """PyAudio input stream opened once and kept open between utterances"""
+
+    def __init__(self, sample_rate=16000, chunk_ms=60, device_index=None):
+        self.sample_rate = sample_rate
+        self.chunk_size = int(sample_rate * chunk_ms / 1000)
+        self.device_index = device_index
+        self._audio = None
+        self._stream = None
+
+    def open(self):
+        pyaudio = sr.Microphone.get_pyaudio()
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16, channels=1, rate=self.sample_rate, input=True,
+            frames_per_buffer=self.chunk_size, input_device_index=self.device_index
+        )
+
+    def read(self):
+        """Next chunk of raw int16 bytes; blocks for about chunk_ms"""
+        return self._stream.read(self.chunk_size, exception_on_overflow=False)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+class WavFileSource:
+    """Replays a 16-bit PCM WAV file as if it were a microphone"""
+
+    def __init__(self, path, chunk_ms=60, realtime=False, loop=False):
+        self.path = str(path)
+        self.chunk_ms = chunk_ms
+        self.realtime = realtime
+        self.loop = loop
+        self._wav = None
+        self.sample_rate = None
+        self.chunk_size = None
+        self._next_chunk_at = None
+
+    def open(self):
+        self._wav = wave.open(self.path, 'rb')
+        if self._wav.getsampwidth() != 2:
+            raise ValueError("only 16-bit PCM WAV files are supported")
+        self.sample_rate = self._wav.getframerate()
+        self.chunk_size = int(self.sample_rate * self.chunk_ms / 1000)
+        self._next_chunk_at = time.monotonic()
+
+    def read(self):
+        """Next chunk of mono int16 bytes, or b"" at the end of the file"""
+        frames = self._wav.readframes(self.chunk_size)
+        if not frames and self.loop:
+            self._wav.rewind()
+            frames = self._wav.readframes(self.chunk_size)
+        channels = self._wav.getnchannels()
+        if channels > 1 and frames:
+            samples = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels)
+            frames = samples.mean(axis=1).astype(np.int16).tobytes()
+        if self.realtime and frames:
+            self._next_chunk_at += len(frames) / 2 / self.sample_rate
+            delay = self._next_chunk_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return frames
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+class Endpointer:
+    """Cuts a continuous sample stream into utterances using the VAD frame mask"""
+
+    def __init__(self, sample_rate, vad=None, pause_ms=800, pre_roll_ms=300,
+                 tail_ms=150, min_speech_ms=120, max_segment_seconds=15.0):
+        self.vad = vad or VoiceActivityDetector()
+        self.frame_length = max(1, int(sample_rate * self.vad.frame_ms / 1000))
+        self.pause = int(sample_rate * pause_ms / 1000)
+        self.pre_roll = int(sample_rate * pre_roll_ms / 1000)
+        self.tail = int(sample_rate * tail_ms / 1000)
+        self.min_speech = int(sample_rate * min_speech_ms / 1000)
+        self.max_segment = int(sample_rate * max_segment_seconds)
+        self.sample_rate = sample_rate
+        self.start = None
+        self.last_speech = None
+        self.speech_samples = 0
+
+    @property
+    def in_speech(self):
+        return self.start is not None
+
+    def process(self, samples, position, oldest):
+        """Feed one chunk that begins at absolute index position; return finished (start, end) spans"""
+        spans = []
+        mask = self.vad.speech_mask(samples, self.sample_rate)
+        for frame, is_speech in enumerate(mask):
+            frame_start = position + frame * self.frame_length
+            frame_end = frame_start + self.frame_length
+            if is_speech:
+                if self.start is None:
+                    self.start = max(frame_start - self.pre_roll, oldest)
+                    self.speech_samples = 0
+                self.last_speech = frame_end
+                self.speech_samples += self.frame_length
+            elif self.start is not None and frame_end - self.last_speech >= self.pause:
+                spans.extend(self._finish(min(self.last_speech + self.tail, frame_end)))
+            if self.start is not None and frame_end - self.start >= self.max_segment:
+                spans.extend(self._finish(frame_end))
+        return spans
+
+    def flush(self, position):
+        """End any utterance in progress, e.g. when the source runs dry"""
+        return self._finish(position) if self.start is not None else []
+
+    def _finish(self, end):
+        span = [(self.start, end)] if self.speech_samples >= self.min_speech else []
+        self.start = None
+        self.last_speech = None
+        self.speech_samples = 0
+        return span
+
+class AudioStream:
+    """Persistent capture: one source read on one thread into one preallocated ring"""
+
+    def __init__(self, source, buffer_seconds=30.0, vad=None, max_queued_segments=32, **endpointing):
+        self.source = source
+        self.buffer_seconds = buffer_seconds
+        self.vad = vad
+        self.max_queued_segments = max_queued_segments
+        self.endpointing = endpointing
+        self.buffer = None
+        self.endpointer = None
+        self.segments = queue.Queue()
+        self.stats = collections.Counter()
+        self.open_seconds = None
+        self.finished = threading.Event()
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def sample_rate(self):
+        return self.source.sample_rate
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        """Open the source once; later calls are no-ops while the stream runs"""
+        with self._lock:
+            if self._running:
+                return
+            started = time.perf_counter()
+            self.source.open()
+            self.open_seconds = time.perf_counter() - started
+            self.buffer = AudioRingBuffer(self.buffer_seconds * self.source.sample_rate, self.source.sample_rate)
+            self.endpointer = Endpointer(self.source.sample_rate, self.vad, **self.endpointing)
+            self.finished.clear()
+            self._running = True
+            self._thread = threading.Thread(target=self._capture, name="audio-stream", daemon=True)
+            self._thread.start()
+
+    def _capture(self):
+        try:
+            while self._running:
+                chunk = self.source.read()
+                if not chunk:
+                    break
+                position = self.buffer.written
+                self.buffer.write(chunk)
+                self.stats["chunks"] += 1
+                # The endpointer reads the chunk back as a view of the ring
+                samples = self.buffer.view(position, self.buffer.written)
+                for start, end in self.endpointer.process(samples, position, self.buffer.oldest):
+                    self._emit(start, end)
+            for start, end in self.endpointer.flush(self.buffer.written):
+                self._emit(start, end)
+        except Exception:
+            self.stats["capture_errors"] += 1
+        finally:
+            self._running = False
+            self.source.close()
+            self.finished.set()
+
+    def _emit(self, start, end):
+        if self.segments.qsize() >= self.max_queued_segments:
+            try:
+                self.segments.get_nowait()
+                self.stats["segments_dropped"] += 1
+            except queue.Empty:
+                pass
+        self.segments.put(AudioSegment(self.buffer, start, end))
+        self.stats["segments"] += 1
+
+    def next_segment(self, timeout=None):
+        """Wait for the next utterance; None on timeout or once a file source is exhausted"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                return self.segments.get(timeout=0.1 if remaining is None or remaining <= 0 else min(remaining, 0.1))
+            except queue.Empty:
+                pass
+            if self.finished.is_set() and self.segments.empty():
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                # Let an utterance that is still being spoken finish
+                if not (self.endpointer and self.endpointer.in_speech and self._running):
+                    return None
+
+    def clear(self):
+        """Discard utterances that nobody consumed"""
+        while True:
+            try:
+                self.segments.get_nowait()
+            except queue.Empty:
+                return
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def metrics(self):
+        metrics = dict(self.stats)
+        metrics["queued_segments"] = self.segments.qsize()
+        if self.buffer is not None:
+            metrics["buffered_seconds"] = round(min(self.buffer.written, self.buffer.capacity) / self.buffer.sample_rate, 1)
+        if self.open_seconds is not None:
+            metrics["open_ms"] = round(self.open_seconds * 1000, 1)
+        return metrics
@@ -0,0 +1,72 @@
+import numpy as np
+
+from modules.intent_matcher import tokenize
+
+class BatchIntentClassifier:
+    """Classify batches of commands with a sparse phrase/intent incidence matrix"""
+
+    def __init__(self, matcher, default="unknown"):
+        self.default = default
+        priorities = matcher.priorities
+        intents = {intent for found in matcher.phrase_intents.values() for intent in found}
+
+        # Column order encodes priority so argmax picks the same winner as
+        # IntentMatcher.classify; column 0 is the fallback intent.
+        ordered = sorted(intents, key=lambda intent: (priorities.get(intent, 0), intent))
+        self.intent_names = np.array([default] + ordered, dtype=object)
+        self._column = {intent: i + 1 for i, intent in enumerate(ordered)}
+
+        self._phrase_ids = {}
+        self.max_phrase_tokens = 1
+        incidence = np.zeros((len(matcher.phrase_intents), len(self.intent_names)), dtype=bool)
+        for phrase_id, (phrase, found) in enumerate(matcher.phrase_intents.items()):
+            self._phrase_ids[phrase] = phrase_id
+            self.max_phrase_tokens = max(self.max_phrase_tokens, phrase.count(" ") + 1)
+            for intent in found:
+                incidence[phrase_id, self._column[intent]] = True
+        self.phrase_incidence = incidence
+
+    def _phrase_hits(self, command):
+        """Return ids of every vocabulary phrase (n-gram) present in the command"""
+        tokens = tokenize(command)
+        phrase_ids = self._phrase_ids
+        hits = []
+        for n in range(1, min(self.max_phrase_tokens, len(tokens)) + 1):
+            for start in range(len(tokens) - n + 1):
+                phrase_id = phrase_ids.get(" ".join(tokens[start:start + n]))
+                if phrase_id is not None:
+                    hits.append(phrase_id)
+        return hits
+
+    def command_incidence(self, commands):
+        """Build the CSR (indptr, indices) command/phrase incidence matrix"""
+        indptr = np.zeros(len(commands) + 1, dtype=np.int64)
+        indices = []
+        for row, command in enumerate(commands):
+            indices.extend(self._phrase_hits(command))
+            indptr[row + 1] = len(indices)
+        return indptr, np.array(indices, dtype=np.int64)
+
+    def classify(self, commands):
+        """Classify commands, returning an intent array and per-intent counts"""
+        # Replayed logs repeat the same utterances heavily, so each distinct
+        # command is matched once and the result is broadcast back.
+        unique = {}
+        inverse = np.fromiter(
+            (unique.setdefault(command, len(unique)) for command in commands),
+            dtype=np.int64,
+            count=len(commands)
+        )
+        indptr, indices = self.command_incidence(list(unique))
+
+        # Sparse (commands x phrases) @ (phrases x intents), reduced with OR
+        rows = np.repeat(np.arange(len(unique)), np.diff(indptr))
+        hits = np.zeros((len(unique), len(self.intent_names)), dtype=bool)
+        np.logical_or.at(hits, rows, self.phrase_incidence[indices])
+
+        weights = np.arange(len(self.intent_names))
+        winners = np.argmax(hits * weights, axis=1)[inverse]
+
+        counts = np.bincount(winners, minlength=len(self.intent_names))
+        summary = {str(name): int(count) for name, count in zip(self.intent_names, counts) if count}
+        return self.intent_names[winners], summary
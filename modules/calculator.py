@@ -0,0 +1,116 @@
+import ast
+import functools
+import math
+import operator
+import time
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+class CalculationError(ValueError):
+    """Raised when an expression is invalid or exceeds the engine's limits"""
+
+class Calculator:
+    """Arithmetic engine with bounded cost, replacing eval for user input"""
+
+    def __init__(self, max_length=200, max_operators=50, max_exponent=1000,
+                 max_result_digits=100, time_budget=0.05, cache_size=1024):
+        self.max_length = max_length
+        self.max_operators = max_operators
+        self.max_exponent = max_exponent
+        self.max_result_digits = max_result_digits
+        self.time_budget = time_budget
+        # Bits needed to hold max_result_digits decimal digits
+        self._max_bits = int(max_result_digits * math.log2(10)) + 1
+        self.parse = functools.lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, expression):
+        """Parse and validate an expression into an AST"""
+        if len(expression) > self.max_length:
+            raise CalculationError("expression is too long")
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError:
+            raise CalculationError("not a valid arithmetic expression")
+
+        operators = 0
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.BinOp, ast.UnaryOp)):
+                operators += 1
+            elif isinstance(node, ast.Constant):
+                if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                    raise CalculationError("only numbers are allowed")
+                # Literals obey the same limit as results, e.g. 1e400 (inf) or a 150-digit integer
+                self._check_size(node.value, "number")
+            elif not isinstance(node, (ast.Expression, *BINARY_OPERATORS, *UNARY_OPERATORS)):
+                raise CalculationError("unsupported syntax")
+        if operators > self.max_operators:
+            raise CalculationError("too many operators")
+        return tree.body
+
+    def _check_size(self, value, what="result"):
+        if isinstance(value, int):
+            if value.bit_length() > self._max_bits:
+                raise CalculationError(f"{what} is too large")
+        elif not math.isfinite(value) or abs(value) >= 10 ** self.max_result_digits:
+            raise CalculationError(f"{what} is too large")
+        return value
+
+    def _power(self, base, exponent):
+        """Exponentiation that refuses results beyond the size limit up front"""
+        if abs(exponent) > self.max_exponent:
+            raise CalculationError("exponent is too large")
+        if base not in (0, 1, -1) and exponent > 0:
+            if exponent * math.log10(abs(base)) > self.max_result_digits:
+                raise CalculationError("result is too large")
+        return base ** exponent
+
+    def _evaluate(self, node, deadline):
+        if time.perf_counter() > deadline:
+            raise CalculationError("calculation took too long")
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.UnaryOp):
+            return UNARY_OPERATORS[type(node.op)](self._evaluate(node.operand, deadline))
+
+        left = self._evaluate(node.left, deadline)
+        right = self._evaluate(node.right, deadline)
+        try:
+            if isinstance(node.op, ast.Pow):
+                result = self._power(left, right)
+            else:
+                result = BINARY_OPERATORS[type(node.op)](left, right)
+        except ZeroDivisionError:
+            raise CalculationError("division by zero")
+        except OverflowError:
+            raise CalculationError("result is too large")
+        if isinstance(result, complex):
+            raise CalculationError("result is not a real number")
+        return self._check_size(result)
+
+    def evaluate(self, expression):
+        """Evaluate one expression, raising CalculationError on failure"""
+        node = self.parse(expression.strip())
+        return self._evaluate(node, time.perf_counter() + self.time_budget)
+
+    def evaluate_many(self, expressions):
+        """Evaluate a list of expressions; failed entries become None"""
+        results = []
+        for expression in expressions:
+            try:
+                results.append(self.evaluate(expression))
+            except CalculationError:
+                results.append(None)
+        return results
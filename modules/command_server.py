@@ -0,0 +1,403 @@
+"""Headless JSON command server for scripts and other frontends.
+
+Run from the project root:
+    python -m modules.command_server --host 127.0.0.1 --port 8765
+
+HTTP endpoints (HTTP/1.1 keep-alive, pipelined requests answered in order):
+    GET  /health
+    GET  /metrics   latency histograms and counters in Prometheus text format
+    POST /command   {"command": "what time is it", "session_id": "optional"}
+    POST /batch     [{"command": ...}, ...] or {"commands": [...]}
+    POST /system    {"action": "status" | "info" | "processes" | "metrics", ...}
+                    {"action": "execute", "command": "open calculator", "wait": true}
+                    (only with --execute-actions or system.execute_actions set)
+                    {"action": "jobs"} or {"action": "job", "job": 3}
+
+WebSocket endpoint GET /ws accepts the same JSON bodies as text messages,
+with a "type" of "command", "batch" or "system"; a JSON list is a batch of
+such messages and gets a list of replies.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import struct
+
+from modules.jarvis_ai import JarvisAI
+from modules.job_scheduler import JobSchedulerBusy, get_job_scheduler
+from modules.utils import get_default_config, load_config, setup_logging
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+logger = logging.getLogger("JARVIS.server")
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+SYSTEM_ACTIONS = {
+    "status": lambda controller, request: controller.get_system_status(),
+    "info": lambda controller, request: dict(controller.system_info),
+    "processes": lambda controller, request: controller.get_running_processes(
+        request.get("count", 10), request.get("sort_by", "cpu")
+    ),
+    "metrics": lambda controller, request: controller.get_metric_stats(
+        request.get("field", "cpu_percent"), request.get("seconds", 3600)
+    )
+}
+
+# Actions served by the job scheduler rather than a direct controller call
+JOB_ACTIONS = ("execute", "jobs", "job")
+
+class RequestError(Exception):
+    """A client error reported back as a JSON error response"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class CommandServer:
+    """asyncio HTTP/WebSocket front end for JarvisAI and SystemController"""
+
+    def __init__(self, jarvis=None, controller=None, host="127.0.0.1", port=8765, execute_actions=False):
+        self.controller = controller
+        self.jobs = get_job_scheduler(controller)
+        # Commands and "execute" launch real applications only when enabled
+        self.execute_actions = execute_actions
+        self.jarvis = jarvis or JarvisAI(job_scheduler=self.jobs if execute_actions else None)
+        self.host = host
+        self.port = port
+        self.requests_served = 0
+
+    def _controller(self):
+        if self.controller is None:
+            # psutil and the sampler thread load on the first /system request
+            self.controller = self.jobs.get_controller()
+        return self.controller
+
+    # Request handling shared by HTTP and WebSocket
+
+    async def handle_command(self, request):
+        command = request.get("command") if isinstance(request, dict) else None
+        if not isinstance(command, str) or not command.strip():
+            raise RequestError("'command' must be a non-empty string")
+        context = None
+        if request.get("session_id"):
+            context = self.jarvis.session_context(str(request["session_id"]))
+        # A system command may wait briefly on its job, so keep it off the event loop
+        loop = asyncio.get_running_loop()
+        intent, response = await loop.run_in_executor(
+            None, self.jarvis.process_command_with_intent, command, context
+        )
+        return {"intent": intent, "response": response}
+
+    def handle_batch(self, request):
+        if isinstance(request, dict):
+            commands = request.get("commands")
+        elif not isinstance(request, list):
+            raise RequestError("batch must be a list of commands")
+        else:
+            commands = [item.get("command") if isinstance(item, dict) else item for item in request]
+        if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+            raise RequestError("batch must be a list of commands")
+        # Batches are replays: system commands get demo replies and never submit jobs
+        intents, counts = self.jarvis.classify_batch(commands)
+        return {
+            "results": [
+                {"intent": str(intent), "response": self.jarvis.handle_intent(intent, command, execute=False)}
+                for intent, command in zip(intents, commands)
+            ],
+            "counts": counts
+        }
+
+    async def handle_system(self, request):
+        if not isinstance(request, dict):
+            raise RequestError("system request must be a JSON object")
+        if request.get("action") in JOB_ACTIONS:
+            return await self.handle_job(request)
+        action = SYSTEM_ACTIONS.get(request.get("action"))
+        if action is None:
+            raise RequestError(f"unknown action; expected one of {sorted([*SYSTEM_ACTIONS, *JOB_ACTIONS])}")
+        # System calls can take milliseconds, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, action, self._controller(), request)
+        return {"result": result}
+
+    async def handle_job(self, request):
+        action = request["action"]
+        if action == "jobs":
+            return {"jobs": self.jobs.jobs(request.get("session_id"), request.get("limit", 20))}
+        if action == "job":
+            job = self.jobs.get(request.get("job"))
+            if job is None:
+                raise RequestError("unknown job", 404)
+            return {"job": job.as_dict()}
+        if not isinstance(request.get("command"), str):
+            raise RequestError("'command' must be a string")
+        if not self.execute_actions:
+            raise RequestError("executing system actions is disabled on this server", 403)
+        try:
+            job = self.jobs.submit(request["command"], request.get("session_id"))
+        except JobSchedulerBusy as e:
+            raise RequestError(str(e), 503)
+        if request.get("wait", True):
+            # Wait without holding a thread; shield keeps a timeout from cancelling the job
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), self.jobs.timeout)
+            except asyncio.TimeoutError:
+                pass
+        job_status = job.as_dict()
+        return {"result": job_status["result"], "job": job_status}
+
+    async def dispatch(self, kind, request):
+        """Run one request and return its JSON-serializable reply"""
+        self.requests_served += 1
+        if kind == "command":
+            return await self.handle_command(request)
+        if kind == "batch":
+            return self.handle_batch(request)
+        if kind == "system":
+            return await self.handle_system(request)
+        if kind == "health":
+            return {"status": "ok", "requests_served": self.requests_served}
+        raise RequestError(f"unknown request type '{kind}'", 404)
+
+    # HTTP
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write_http(writer, 413, {"error": "headers too large"}, False)
+                    break
+
+                method, path, version, headers = self._parse_head(head)
+                keep_alive = self._keep_alive(version, headers)
+
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(reader, writer, headers)
+                    break
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    await self._write_http(writer, 400, {"error": "bad Content-Length"}, False)
+                    break
+                if length < 0 or length > MAX_BODY_BYTES:
+                    await self._write_http(writer, 413, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._http_route(method, path, body)
+                await self._write_http(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head):
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ", 2)
+        except ValueError:
+            method, path, version = "GET", "/", "HTTP/1.0"
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method, path.split("?", 1)[0], version, headers
+
+    @staticmethod
+    def _keep_alive(version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def _http_route(self, method, path, body):
+        routes = {"/command": "command", "/batch": "batch", "/system": "system", "/health": "health"}
+        if path == "/metrics":
+            return 200, self.jarvis.telemetry.render_prometheus()
+        kind = routes.get(path)
+        if kind is None:
+            return 404, {"error": "not found"}
+        if kind != "health" and method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            request = json.loads(body) if body else {}
+            return 200, await self.dispatch(kind, request)
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            logger.exception("Request to %s failed", path, extra={"route": path})
+            return 500, {"error": str(e)}
+
+    @staticmethod
+    async def _write_http(writer, status, payload, keep_alive):
+        # Text payloads are Prometheus metrics; everything else is JSON
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = "text/plain; version=0.0.4"
+        else:
+            body = json.dumps(payload).encode('utf-8')
+            content_type = "application/json"
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode('latin-1')
+        writer.write(head + body)
+        await writer.drain()
+
+    # WebSocket (RFC 6455 text frames)
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode('latin-1'))
+        await writer.drain()
+
+        while True:
+            message = await self._read_message(reader, writer)
+            if message is None:
+                break
+            try:
+                request = json.loads(message)
+                if isinstance(request, list):
+                    reply = [await self._websocket_reply(item) for item in request]
+                else:
+                    reply = await self._websocket_reply(request)
+            except ValueError as e:
+                reply = {"error": f"invalid JSON: {e}"}
+            self._write_frame(writer, 0x1, json.dumps(reply).encode('utf-8'))
+            await writer.drain()
+
+    async def _websocket_reply(self, request):
+        try:
+            if not isinstance(request, dict):
+                raise RequestError("message must be a JSON object")
+            kind = request.get("type", "command")
+            if kind == "batch":
+                return await self.dispatch(kind, request.get("commands", []))
+            return await self.dispatch(kind, request)
+        except RequestError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            logger.exception("WebSocket request failed", extra={"route": "/ws"})
+            return {"error": str(e)}
+
+    async def _read_message(self, reader, writer):
+        """Read one complete text message, answering pings; None on close"""
+        fragments = []
+        size = 0
+        while True:
+            try:
+                first, second = await reader.readexactly(2)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return None
+            fin = first & 0x80
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await reader.readexactly(8))[0]
+            if size + length > MAX_BODY_BYTES:
+                self._write_frame(writer, 0x8, struct.pack("!H", 1009))
+                return None
+            mask = await reader.readexactly(4) if second & 0x80 else None
+            payload = await reader.readexactly(length)
+            if mask:
+                payload = self._unmask(payload, mask)
+
+            if opcode == 0x8:
+                self._write_frame(writer, 0x8, payload[:2])
+                return None
+            if opcode == 0x9:
+                self._write_frame(writer, 0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            fragments.append(payload)
+            size += length
+            if fin:
+                try:
+                    return b"".join(fragments).decode('utf-8')
+                except UnicodeDecodeError:
+                    # RFC 6455: a text message that is not valid UTF-8 closes with 1007
+                    self._write_frame(writer, 0x8, struct.pack("!H", 1007))
+                    return None
+
+    @staticmethod
+    def _unmask(payload, mask):
+        if not payload:
+            return payload
+        repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+        value = int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')
+        return value.to_bytes(len(payload), 'big')
+
+    @staticmethod
+    def _write_frame(writer, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        writer.write(header + payload)
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        print(f"JARVIS command server listening on http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless JARVIS command server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--execute-actions", action="store_true",
+                        help="launch real applications for system commands")
+    args = parser.parse_args()
+    setup_logging(load_config().get("logging"))
+    settings = {**get_default_config()["system"], **load_config().get("system", {})}
+    server = CommandServer(host=args.host, port=args.port,
+                           execute_actions=args.execute_actions or settings["execute_actions"])
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
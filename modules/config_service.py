@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import threading
+from types import MappingProxyType
+
+def freeze(value):
+    """Return a read-only view of parsed JSON: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value):
+    """Return a mutable deep copy of a frozen snapshot"""
+    if isinstance(value, MappingProxyType) or isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple) or isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+def atomic_write_json(path, data, indent=4):
+    """Write JSON to a temp file in the same directory and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(thaw(data), f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class ConfigService:
+    """Process-wide cache of parsed JSON config files with hot reload"""
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._entries = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _signature(key):
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self, key, previous=None):
+        """Parse a file into an (signature, snapshot) entry"""
+        signature = self._signature(key)
+        if signature is None:
+            return (None, None)
+        try:
+            with open(key, 'r') as f:
+                return (signature, freeze(json.load(f)))
+        except (OSError, ValueError):
+            # Keep serving the last good snapshot while a file is mid-edit
+            return (signature, previous[1] if previous else None)
+
+    def get(self, path, default=None):
+        """Return the immutable snapshot of a config file"""
+        key = self._key(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._read(key)
+                    self._entries[key] = entry
+            self._start_watcher()
+        return default if entry[1] is None else entry[1]
+
+    def save(self, path, data):
+        """Atomically write a config file and publish the new snapshot"""
+        key = self._key(path)
+        with self._lock:
+            atomic_write_json(key, data)
+            snapshot = freeze(thaw(data))
+            self._entries[key] = (self._signature(key), snapshot)
+        self._notify(key, snapshot)
+        self._start_watcher()
+        return snapshot
+
+    def subscribe(self, path, callback):
+        """Call callback(snapshot) whenever the file changes"""
+        with self._lock:
+            self._subscribers.setdefault(self._key(path), []).append(callback)
+
+    def _notify(self, key, snapshot):
+        for callback in list(self._subscribers.get(key, [])):
+            try:
+                callback(snapshot)
+            except Exception:
+                continue
+
+    def _start_watcher(self):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self.check_for_changes()
+
+    def check_for_changes(self):
+        """Reload files whose mtime or size changed and notify subscribers"""
+        changed = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if self._signature(key) != entry[0]:
+                    new_entry = self._read(key, entry)
+                    self._entries[key] = new_entry
+                    if new_entry[1] is not entry[1]:
+                        changed.append((key, new_entry[1]))
+        for key, snapshot in changed:
+            self._notify(key, snapshot)
+        return len(changed)
+
+    def stop(self):
+        self._stop_event.set()
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+def get_config_service():
+    """Return the config service shared by every session"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = ConfigService()
+        return _shared_service
@@ -0,0 +1,173 @@
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+class ConversationLog:
+    """Append-only JSONL conversation log split into size-rotated segments"""
+
+    def __init__(self, log_dir="data/conversation_log", max_records=None,
+                 segment_bytes=1024 * 1024, fsync_every=32, fsync_interval=1.0):
+        self.log_dir = Path(log_dir)
+        self.max_records = max_records
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._line_counts = {}
+
+    def segments(self):
+        """Return segment paths from oldest to newest"""
+        if not self.log_dir.exists():
+            return []
+        return sorted(self.log_dir.glob("segment-*.jsonl"))
+
+    def _segment_path(self, number):
+        return self.log_dir / f"segment-{number:08d}.jsonl"
+
+    def _open_active(self):
+        """Open the newest segment for appending, creating one if needed"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        segments = self.segments()
+        path = segments[-1] if segments else self._segment_path(1)
+        self._file = open(path, 'ab')
+        # Only an open log needs closing at exit; close() unregisters again
+        atexit.register(self.close)
+        if self._file.tell():
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                last_byte = f.read(1)
+            if last_byte != b"\n":
+                # Terminate a line left partial by a crash so the next record parses
+                self._file.write(b"\n")
+
+    def append(self, record):
+        """Append one record; data reaches the OS at once, fsync is batched"""
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+        with self._lock:
+            if self._file is None:
+                self._open_active()
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            if self._file.tell() >= self.segment_bytes:
+                self._rotate()
+
+    def flush(self):
+        """Force pending records to stable storage"""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate(self):
+        """Seal the active segment and start a new one"""
+        self._sync()
+        current = Path(self._file.name)
+        self._file.close()
+        number = int(current.stem.split('-')[1]) + 1
+        self._file = open(self._segment_path(number), 'ab')
+        self._compact()
+
+    def close(self):
+        """Flush and close the active segment"""
+        with self._lock:
+            if self._file is not None:
+                if self._unsynced:
+                    self._sync()
+                self._file.close()
+                self._file = None
+                atexit.unregister(self.close)
+
+    def read_tail(self, count):
+        """Return the last count records, reading segments backwards"""
+        if count <= 0:
+            return []
+        # One spare line covers a record left partial by a crash
+        wanted = count + 1
+        lines = []
+        for path in reversed(self.segments()):
+            lines[:0] = self._tail_lines(path, wanted - len(lines))
+            if len(lines) >= wanted:
+                break
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A crash can leave a partially written final line
+                continue
+        return records[-count:]
+
+    def _tail_lines(self, path, count, block_size=64 * 1024):
+        """Read at most count complete lines from the end of a segment"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = [line for line in data.split(b"\n") if line]
+        if position > 0:
+            # The first line may have been cut by the block boundary
+            lines = lines[1:]
+        return lines[-count:]
+
+    def _count_lines(self, path, cache=True):
+        """Count records in a segment, caching counts of sealed segments"""
+        if path.name in self._line_counts:
+            return self._line_counts[path.name]
+        with open(path, 'rb') as f:
+            count = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1024 * 1024), b""))
+        if cache:
+            self._line_counts[path.name] = count
+        return count
+
+    def compact(self, max_records=None):
+        """Drop sealed segments that only hold records older than max_records"""
+        with self._lock:
+            return self._compact(max_records)
+
+    def _compact(self, max_records=None):
+        if max_records is None:
+            max_records = self.max_records
+        segments = self.segments()
+        if max_records is None or not segments:
+            return 0
+
+        # Sealed segments are never rewritten, so whole files are dropped once
+        # newer segments already hold max_records records
+        kept = self._count_lines(segments[-1], cache=False)
+        removed = 0
+        for path in reversed(segments[:-1]):
+            if kept >= max_records:
+                path.unlink()
+                self._line_counts.pop(path.name, None)
+                removed += 1
+            else:
+                kept += self._count_lines(path)
+        return removed
+
+    def clear(self):
+        """Delete every segment"""
+        self.close()
+        with self._lock:
+            for path in self.segments():
+                path.unlink()
+            self._line_counts.clear()
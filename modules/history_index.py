@@ -0,0 +1,185 @@
+import datetime
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "about", "an", "and", "are", "ask", "asked", "did", "do", "for", "i",
+    "in", "is", "it", "me", "my", "of", "on", "or", "the", "to", "was", "what",
+    "when", "you"
+}
+
+# Relative date phrases understood by parse_history_query, as (days back, span)
+RELATIVE_RANGES = {
+    "today": (0, 1),
+    "yesterday": (1, 1),
+    "this week": (6, 7),
+    "last week": (7, 7),
+    "past week": (6, 7),
+    "this month": (29, 30),
+    "last month": (30, 30)
+}
+
+def normalize_tokens(text):
+    """Split text into lowercase alphanumeric search tokens"""
+    return WORD_PATTERN.findall(text.lower()) if text else []
+
+def to_epoch(timestamp):
+    """Convert an ISO string, datetime or number to epoch seconds"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.datetime.fromisoformat(timestamp)
+    if isinstance(timestamp, datetime.datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+def parse_history_query(text, now=None):
+    """Split a free-text query into keywords and an optional time range"""
+    now = now or datetime.datetime.now()
+    text = text.lower()
+    start = end = None
+    for phrase, (days_back, span) in RELATIVE_RANGES.items():
+        if phrase in text:
+            midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            range_start = midnight - datetime.timedelta(days=days_back)
+            start = range_start.timestamp()
+            end = (range_start + datetime.timedelta(days=span)).timestamp()
+            text = text.replace(phrase, " ")
+            break
+    keywords = [token for token in normalize_tokens(text) if token not in STOPWORDS]
+    return keywords, start, end
+
+def session_token(session_id):
+    """Posting-list key for a session; the colon keeps it apart from word tokens"""
+    return f"session:{session_id}"
+
+def _contains(postings, item):
+    """Binary search membership test on a sorted posting list"""
+    position = bisect_left(postings, item)
+    return position < len(postings) and postings[position] == item
+
+class HistoryIndex:
+    """Incremental inverted index and timestamp index over conversation turns"""
+
+    def __init__(self, fields=("user_input", "ai_response")):
+        self.fields = fields
+        self._records = []
+        self._timestamps = array('d')
+        self._postings = {}
+        self._base_id = 0
+        self._first_id = 0
+        self._next_id = 0
+
+    def __len__(self):
+        return self._next_id - self._first_id
+
+    def add(self, record):
+        """Index one conversation record and return its id"""
+        record_id = self._next_id
+        timestamp = to_epoch(record.get("timestamp", 0))
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            # Keep the timestamp index sorted if the clock steps backwards
+            timestamp = self._timestamps[-1]
+
+        self._records.append(record)
+        self._timestamps.append(timestamp)
+        tokens = set()
+        for field in self.fields:
+            tokens.update(normalize_tokens(record.get(field)))
+        if record.get("session_id"):
+            tokens.add(session_token(record["session_id"]))
+        for token in tokens:
+            self._postings.setdefault(token, []).append(record_id)
+        self._next_id += 1
+        return record_id
+
+    def evict_before(self, record_id):
+        """Drop records with ids below record_id"""
+        record_id = min(record_id, self._next_id)
+        if record_id <= self._first_id:
+            return
+        self._first_id = record_id
+
+        # Storage and posting lists are trimmed lazily once dead entries
+        # outnumber live ones, so eviction stays amortized O(1)
+        if self._first_id - self._base_id > len(self):
+            self._compact()
+
+    def evict_to(self, max_records):
+        """Keep only the newest max_records records"""
+        self.evict_before(self._next_id - max_records)
+
+    def _compact(self):
+        dead = self._first_id - self._base_id
+        del self._records[:dead]
+        del self._timestamps[:dead]
+        self._base_id = self._first_id
+
+        first_id = self._first_id
+        pruned = {}
+        for token, postings in self._postings.items():
+            live = postings[bisect_left(postings, first_id):]
+            if live:
+                pruned[token] = live
+        self._postings = pruned
+
+    def clear(self):
+        """Remove every record"""
+        self._records = []
+        self._timestamps = array('d')
+        self._postings = {}
+        self._first_id = self._base_id = self._next_id
+
+    def _id_range(self, start, end):
+        """Return the [low, high) live id window for a timestamp range"""
+        live = self._first_id - self._base_id
+        low = self._first_id
+        high = self._next_id
+        if start is not None:
+            low = self._base_id + bisect_left(self._timestamps, to_epoch(start), live)
+        if end is not None:
+            high = self._base_id + bisect_right(self._timestamps, to_epoch(end), live)
+        return low, high
+
+    def search(self, keywords=None, start=None, end=None, limit=20, session_id=None):
+        """Return newest-first records matching every keyword within a time range
+
+        With a session_id only that session's records are searched.
+        """
+        low, high = self._id_range(start, end)
+        if low >= high:
+            return []
+
+        tokens = set()
+        for keyword in keywords or []:
+            tokens.update(normalize_tokens(keyword))
+        if session_id is not None:
+            tokens.add(session_token(session_id))
+        if not tokens:
+            return [self._records[record_id - self._base_id]
+                    for record_id in range(high - 1, max(low, high - limit) - 1, -1)]
+
+        postings = []
+        for token in tokens:
+            token_postings = self._postings.get(token)
+            if not token_postings:
+                return []
+            postings.append(token_postings)
+        postings.sort(key=len)
+        shortest, others = postings[0], postings[1:]
+
+        results = []
+        position = bisect_left(shortest, high) - 1
+        floor = bisect_left(shortest, low)
+        while position >= floor and len(results) < limit:
+            record_id = shortest[position]
+            if all(_contains(other, record_id) for other in others):
+                results.append(self._records[record_id - self._base_id])
+            position -= 1
+        return results
+
+    def query(self, text, limit=20, now=None, session_id=None):
+        """Search with a free-text query such as 'weather last week'"""
+        keywords, start, end = parse_history_query(text, now)
+        return self.search(keywords, start, end, limit, session_id)
@@ -0,0 +1,145 @@
+import json
+import re
+
+# A slash or hyphen written tight between digits ("10/18", "2026-10-18")
+# is one date-like token, not an operator
+TOKEN_PATTERN = re.compile(r"\d+(?:[/-]\d+)+|[a-z0-9]+|[+\-*/]")
+
+OPERATORS = frozenset("+-*/")
+
+# Higher value wins when a command matches phrases from several intents
+INTENT_PRIORITIES = {
+    "calculation": 80,
+    "system": 70,
+    "weather": 60,
+    "date": 50,
+    "time": 40,
+    "joke": 30,
+    "goodbye": 20,
+    "greeting": 10
+}
+
+# Map commands database groups to the intent names handled by JarvisAI
+INTENT_ALIASES = {
+    "greetings": "greeting",
+    "time_queries": "time",
+    "date_queries": "date",
+    "weather_queries": "weather",
+    "system_commands": "system",
+    "calculations": "calculation",
+    "jokes": "joke",
+    "goodbye": "goodbye"
+}
+
+def tokenize(text):
+    """Split text into lowercase word tokens, keeping operators only between numbers"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if OPERATORS.isdisjoint(tokens):
+        return tokens
+    last = len(tokens) - 1
+    return [
+        token for i, token in enumerate(tokens)
+        if token not in OPERATORS or (0 < i < last and tokens[i - 1].isdigit() and tokens[i + 1].isdigit())
+    ]
+
+def tokenize_phrase(phrase):
+    """Tokens of a vocabulary phrase; a bare operator such as "+" is a phrase of its own"""
+    return TOKEN_PATTERN.findall(phrase.lower())
+
+def load_command_phrases(config_path="config/commands.json"):
+    """Load intent phrase lists from the commands config file"""
+    try:
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    phrases = {}
+    for keywords in config.get("system_commands", {}).values():
+        phrases.setdefault("system", []).extend(keywords)
+    for intent, keywords in config.get("information_queries", {}).items():
+        phrases.setdefault(intent, []).extend(keywords)
+    return phrases
+
+class IntentMatcher:
+    """Token-level Aho-Corasick automaton that maps phrases to intents"""
+
+    def __init__(self, phrases_by_intent, priorities=None):
+        self.priorities = dict(INTENT_PRIORITIES if priorities is None else priorities)
+        self.phrase_count = 0
+        self.phrase_intents = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+
+        for intent, phrases in phrases_by_intent.items():
+            for phrase in phrases:
+                self._add_phrase(tokenize_phrase(phrase), intent)
+        self._build_failure_links()
+
+    @classmethod
+    def from_sources(cls, commands_db, config_path="config/commands.json", priorities=None):
+        """Build a matcher from the commands database and config phrase lists"""
+        phrases = {}
+        for group, keywords in commands_db.items():
+            phrases.setdefault(INTENT_ALIASES.get(group, group), []).extend(keywords)
+        for intent, keywords in load_command_phrases(config_path).items():
+            phrases.setdefault(intent, []).extend(keywords)
+        return cls(phrases, priorities)
+
+    def _add_phrase(self, tokens, intent):
+        """Insert a tokenized phrase into the trie"""
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(intent)
+        self.phrase_intents.setdefault(" ".join(tokens), set()).add(intent)
+        self.phrase_count += 1
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for token, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] |= self._output[self._fail[child]]
+                queue.append(child)
+        self._output = [frozenset(output) for output in self._output]
+
+    def find_intents(self, command):
+        """Return every intent with a phrase in the command, in one pass"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        state = 0
+        for token in tokenize(command):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+    def classify(self, command, default="unknown"):
+        """Return the highest priority intent found in the command"""
+        found = self.find_intents(command)
+        if not found:
+            return default
+        priorities = self.priorities
+        return max(found, key=lambda intent: (priorities.get(intent, 0), intent))
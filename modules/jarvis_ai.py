@@ -0,0 +1,280 @@
+import collections
+import concurrent.futures
+import datetime
+import logging
+import random
+import re
+import threading
+import time
+from types import MappingProxyType
+
+from modules.calculator import CalculationError, Calculator
+from modules.intent_matcher import IntentMatcher
+from modules.job_scheduler import JobSchedulerBusy, classify_command
+from modules.telemetry import get_telemetry, timed
+
+logger = logging.getLogger("JARVIS.engine")
+
+class SessionContext:
+    """Conversational context of one session"""
+    __slots__ = ('session_id', 'recent_commands')
+    
+    def __init__(self, session_id, max_commands=10):
+        self.session_id = session_id
+        self.recent_commands = collections.deque(maxlen=max_commands)
+    
+    def remember(self, command):
+        """Record a command; the oldest drops off in O(1)"""
+        self.recent_commands.append(command)
+
+class SessionContextStore:
+    """Session contexts keyed by session id, least recently used evicted first"""
+    
+    def __init__(self, max_sessions=1000, max_commands=10):
+        self.max_sessions = max_sessions
+        self.max_commands = max_commands
+        self._contexts = collections.OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, session_id):
+        """Get or create the context for a session"""
+        with self._lock:
+            context = self._contexts.get(session_id)
+            if context is None:
+                context = SessionContext(session_id, self.max_commands)
+                self._contexts[session_id] = context
+                if len(self._contexts) > self.max_sessions:
+                    self._contexts.popitem(last=False)
+            else:
+                self._contexts.move_to_end(session_id)
+            return context
+    
+    def discard(self, session_id):
+        """Forget a session's context"""
+        with self._lock:
+            self._contexts.pop(session_id, None)
+    
+    def __len__(self):
+        return len(self._contexts)
+
+class JarvisAI:
+    """Shared command engine; read-only after construction so any thread can call it"""
+    
+    def __init__(self, max_sessions=1000, job_scheduler=None, job_reply_wait=0.5):
+        self.commands_db = MappingProxyType(
+            {group: tuple(keywords) for group, keywords in self.load_commands_database().items()}
+        )
+        self.intent_matcher = IntentMatcher.from_sources(self.commands_db)
+        self.calculator = Calculator()
+        self.sessions = SessionContextStore(max_sessions=max_sessions)
+        self.telemetry = get_telemetry()
+        # Without a scheduler, system commands only describe what they would do
+        self.job_scheduler = job_scheduler
+        self.job_reply_wait = job_reply_wait
+        self._batch_classifier = None
+        self._batch_lock = threading.Lock()
+    
+    @property
+    def batch_classifier(self):
+        """NumPy batch classifier, built on the first batch so single commands never import NumPy"""
+        if self._batch_classifier is None:
+            with self._batch_lock:
+                if self._batch_classifier is None:
+                    from modules.batch_classifier import BatchIntentClassifier
+                    self._batch_classifier = BatchIntentClassifier(self.intent_matcher)
+        return self._batch_classifier
+    
+    def load_commands_database(self):
+        """Load command patterns and responses"""
+        return {
+            "greetings": ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"],
+            "time_queries": ["time", "what time", "current time"],
+            "date_queries": ["date", "what date", "today", "current date"],
+            "weather_queries": ["weather", "temperature", "forecast"],
+            "system_commands": ["open", "close", "launch", "start", "shutdown", "restart"],
+            "calculations": ["calculate", "compute", "math", "+", "-", "*", "/"],
+            "jokes": ["joke", "funny", "humor", "laugh"],
+            "goodbye": ["bye", "goodbye", "see you", "exit", "quit"]
+        }
+    
+    def session_context(self, session_id):
+        """Get the conversational context for a session"""
+        return self.sessions.get(session_id)
+    
+    def process_command(self, command, context=None):
+        """Main command processing function"""
+        return self.process_command_with_intent(command, context)[1]
+    
+    def process_command_with_intent(self, command, context=None):
+        """process_command, returning (intent, response) for callers that report the intent"""
+        command_lower = command.lower().strip()
+        
+        # Update the caller's session context, never shared state
+        if context is not None:
+            context.remember(command_lower)
+        
+        # Classify and handle command, timed per intent while telemetry or debug logging is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        started = time.perf_counter() if self.telemetry.enabled or debug else None
+        intent = self.classify_intent(command_lower)
+        response = self.handle_intent(intent, command, context.session_id if context is not None else None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            self.telemetry.observe("jarvis_command_seconds", intent, elapsed)
+            if debug:
+                logger.debug("Command handled", extra={
+                    "intent": intent,
+                    "latency_ms": round(elapsed * 1000, 3),
+                    "session_id": context.session_id if context is not None else None
+                })
+        return intent, response
+    
+    def handle_intent(self, intent, command, session_id=None, execute=True):
+        """Dispatch a classified command to its handler
+
+        With execute=False system commands always get the demo reply, even
+        when a job scheduler is attached; batch and replay callers use it.
+        """
+        command_lower = command.lower().strip()
+        
+        if intent == "greeting":
+            return self.handle_greeting()
+        elif intent == "time":
+            return self.handle_time_query()
+        elif intent == "date":
+            return self.handle_date_query()
+        elif intent == "weather":
+            return self.handle_weather_query(command_lower)
+        elif intent == "system":
+            return self.handle_system_command(command_lower, session_id, execute)
+        elif intent == "calculation":
+            return self.handle_calculation(command_lower)
+        elif intent == "joke":
+            return self.handle_joke_request()
+        elif intent == "goodbye":
+            return self.handle_goodbye()
+        else:
+            return self.handle_unknown_command(command)
+    
+    def classify_intent(self, command):
+        """Classify user intent based on command"""
+        return self.intent_matcher.classify(command)
+    
+    def classify_batch(self, commands):
+        """Classify a batch of commands, returning intents and per-intent counts"""
+        return self.batch_classifier.classify(commands)
+    
+    def process_batch(self, commands):
+        """Process a batch of commands with a single classification pass"""
+        # Replayed commands do not touch any session context and never launch anything
+        intents, counts = self.classify_batch(commands)
+        responses = [self.handle_intent(intent, command, execute=False)
+                     for intent, command in zip(intents, commands)]
+        return responses, counts
+    
+    @timed("jarvis_handler_seconds", "handle_greeting")
+    def handle_greeting(self):
+        greetings = [
+            "Hello! I'm JARVIS, your AI assistant. How can I help you today?",
+            "Greetings! JARVIS at your service. What can I do for you?",
+            "Hi there! Ready to assist you with anything you need.",
+            "Good day! JARVIS here, ready for your commands."
+        ]
+        return random.choice(greetings)
+    
+    @timed("jarvis_handler_seconds", "handle_time_query")
+    def handle_time_query(self):
+        current_time = datetime.datetime.now().strftime("%I:%M %p")
+        return f"The current time is {current_time}"
+    
+    @timed("jarvis_handler_seconds", "handle_date_query")
+    def handle_date_query(self):
+        current_date = datetime.datetime.now().strftime("%B %d, %Y")
+        day_of_week = datetime.datetime.now().strftime("%A")
+        return f"Today is {day_of_week}, {current_date}"
+    
+    @timed("jarvis_handler_seconds", "handle_weather_query")
+    def handle_weather_query(self, command):
+        # For demo purposes - you'd integrate with a real weather API
+        cities = ["New York", "London", "Tokyo", "Paris", "Sydney"]
+        weather_conditions = ["sunny", "cloudy", "rainy", "partly cloudy", "clear"]
+        temperature = random.randint(15, 30)
+        condition = random.choice(weather_conditions)
+        
+        return f"I'd need access to a weather API for real data, but here's a demo: It's {temperature}°C and {condition} outside. For real weather data, please integrate with OpenWeatherMap API."
+    
+    @timed("jarvis_handler_seconds", "handle_system_command")
+    def handle_system_command(self, command, session_id=None, execute=True):
+        if execute and self.job_scheduler is not None and classify_command(command):
+            return self.run_system_job(command, session_id)
+        if "open" in command:
+            if "calculator" in command:
+                return "Calculator would be opened (system integration needed for actual execution)"
+            elif "notepad" in command:
+                return "Notepad would be opened (system integration needed for actual execution)"
+            elif "browser" in command or "chrome" in command:
+                return "Browser would be opened (system integration needed for actual execution)"
+            else:
+                return "System command recognized but specific application not identified"
+        elif "shutdown" in command:
+            return "Shutdown command received (would require elevated permissions in actual implementation)"
+        else:
+            return "System command recognized but not implemented in this demo version"
+    
+    def run_system_job(self, command, session_id=None):
+        """Hand a system action to the scheduler; quick ones answer inline, slow ones by job number"""
+        try:
+            job = self.job_scheduler.submit(command, session_id)
+        except JobSchedulerBusy:
+            return "I'm still working through earlier system commands. Please try again in a moment."
+        if job.duplicates:
+            return f"Already on it: {job.action.replace('_', ' ')} is job #{job.job_id} ({job.state})."
+        try:
+            return job.wait(self.job_reply_wait)
+        except concurrent.futures.TimeoutError:
+            return f"Working on it: {job.action.replace('_', ' ')} is running as job #{job.job_id}."
+    
+    @timed("jarvis_handler_seconds", "handle_calculation")
+    def handle_calculation(self, command):
+        try:
+            # Simple calculation parser
+            # Extract numbers and operators
+            expression = re.findall(r'[\d+\-*/().]+', command)
+            if expression:
+                result = self.calculator.evaluate(''.join(expression))
+                return f"The result is: {result}"
+            return "I can help with calculations, but I need a clearer mathematical expression. Try something like '2 + 2' or 'calculate 10 * 5'"
+        except CalculationError as e:
+            return f"I couldn't process that calculation ({e}). Please try a simpler format like '2 + 2'"
+    
+    @timed("jarvis_handler_seconds", "handle_joke_request")
+    def handle_joke_request(self):
+        jokes = [
+            "Why don't scientists trust atoms? Because they make up everything!",
+            "Why did the AI go to therapy? It had too many deep learning issues!",
+            "What do you call a computer that sings? A-Dell!",
+            "Why don't robots ever panic? They have great artificial composure!",
+            "What's an AI's favorite type of music? Algo-rhythms!"
+        ]
+        return random.choice(jokes)
+    
+    @timed("jarvis_handler_seconds", "handle_goodbye")
+    def handle_goodbye(self):
+        farewells = [
+            "Goodbye! Feel free to call on me anytime you need assistance.",
+            "See you later! I'll be here whenever you need help.",
+            "Until next time! Stay safe and productive.",
+            "Farewell! It was a pleasure assisting you today."
+        ]
+        return random.choice(farewells)
+    
+    @timed("jarvis_handler_seconds", "handle_unknown_command")
+    def handle_unknown_command(self, command):
+        responses = [
+            f"I'm not sure I understand '{command}'. Could you rephrase that?",
+            "That's an interesting request! I'm still learning. Can you try asking differently?",
+            "I don't have that capability yet, but I'm always improving. What else can I help with?",
+            "Could you clarify what you'd like me to do? I'm here to help!"
+        ]
+        return random.choice(responses)
+
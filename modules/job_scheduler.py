@@ -0,0 +1,292 @@
+"""Background execution of SystemController actions.
+
+Commands are mapped to actions and run on a small thread pool. Per-action
+limits stop, for example, several browser launches racing each other. A
+repeated command is merged into the job already queued or running for
+that action by the same session. A launch whose app is still running
+within dedupe_window is merged into that earlier job too. A monitor
+thread enforces timeouts, kills the child processes of jobs that overran
+and reaps children that exited so none are left as zombies.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+import threading
+import time
+
+from modules.telemetry import get_telemetry
+
+# Phrases that select each controller action, checked in order
+COMMAND_ACTIONS = (
+    ("open_calculator", ("open calculator", "launch calculator")),
+    ("open_notepad", ("open notepad", "launch notepad")),
+    ("open_browser", ("open browser",)),
+    ("system_status", ("system info", "system status"))
+)
+
+# Actions that start an application and leave it running
+LAUNCH_ACTIONS = frozenset({"open_calculator", "open_notepad", "open_browser"})
+
+DEFAULT_ACTION_LIMITS = {"open_calculator": 1, "open_notepad": 1, "open_browser": 1, "system_status": 2}
+
+ACTIVE_STATES = frozenset({"queued", "running"})
+
+logger = logging.getLogger("JARVIS.jobs")
+
+def classify_command(command):
+    """Controller action for a command, or None when it is not a system action"""
+    command_lower = command.lower()
+    for action, phrases in COMMAND_ACTIONS:
+        if any(phrase in command_lower for phrase in phrases):
+            return action
+    return None
+
+class JobSchedulerBusy(RuntimeError):
+    """Raised when the pending-job limit is reached"""
+
+class Job:
+    """One submitted action and its lifecycle"""
+
+    def __init__(self, job_id, action, command, session_id=None):
+        self.job_id = job_id
+        self.action = action
+        self.command = command
+        self.session_id = session_id
+        self.state = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.duplicates = 0
+        self.future = concurrent.futures.Future()
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+    def wait(self, timeout=None):
+        """Block until the job has finished; returns its result or error text"""
+        return self.future.result(timeout)
+
+    def _finish(self, state, result=None, error=None):
+        self.state = state
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        if not self.future.done():
+            self.future.set_result(result if error is None else error)
+
+    def as_dict(self):
+        end = self.finished_at or time.time()
+        return {
+            "job": self.job_id,
+            "action": self.action,
+            "command": self.command,
+            "state": self.state,
+            "duplicates": self.duplicates,
+            "waited_s": round((self.started_at or end) - self.submitted_at, 2),
+            "ran_s": round(end - self.started_at, 2) if self.started_at else None,
+            "result": self.error or self.result
+        }
+
+class JobScheduler:
+    """Bounded pool running controller actions off the request path"""
+
+    def __init__(self, controller=None, workers=4, action_limits=None, timeout=30.0,
+                 dedupe_window=5.0, max_pending=64, history=200):
+        self.controller = controller
+        self.workers = workers
+        self.action_limits = {**DEFAULT_ACTION_LIMITS, **(action_limits or {})}
+        self.timeout = timeout
+        self.dedupe_window = dedupe_window
+        self.max_pending = max_pending
+        self.telemetry = get_telemetry()
+        self.stats = collections.Counter()
+        self._jobs = collections.OrderedDict()
+        self._history = history
+        self._waiting = collections.defaultdict(collections.deque)
+        self._running = collections.Counter()
+        self._latest = {}  # (action, session_id) -> newest job
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._controller_lock = threading.Lock()
+        self._executor = None
+        self._monitor = None
+        self._stop_event = threading.Event()
+
+    def get_controller(self):
+        """The wrapped SystemController, created on first use"""
+        with self._controller_lock:
+            if self.controller is None:
+                # psutil and the sampler thread load with the first job
+                from modules.system_control import SystemController
+                self.controller = SystemController()
+            return self.controller
+
+    def _start(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="system-job")
+            self._monitor = threading.Thread(target=self._watch, name="system-job-monitor", daemon=True)
+            self._monitor.start()
+
+    def submit(self, command, session_id=None):
+        """Queue a command; returns its Job, or the earlier Job it duplicates"""
+        action = classify_command(command) or "unknown"
+        with self._lock:
+            duplicate = self._duplicate_of(action, session_id)
+            if duplicate is not None:
+                duplicate.duplicates += 1
+                self.stats["deduplicated"] += 1
+                return duplicate
+            pending = sum(len(waiting) for waiting in self._waiting.values())
+            if pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise JobSchedulerBusy("too many system jobs are waiting")
+
+            job = Job(next(self._job_ids), action, command, session_id)
+            self._jobs[job.job_id] = job
+            self._latest[action, session_id] = job
+            self._trim_history()
+            self._waiting[action].append(job)
+            self.stats["submitted"] += 1
+            self._start()
+            self._dispatch(action)
+        return job
+
+    def _duplicate_of(self, action, session_id):
+        """An earlier job of the same session the new submission should be merged into"""
+        if action == "unknown":
+            return None
+        latest = self._latest.get((action, session_id))
+        if latest is None:
+            return None
+        if latest.active:
+            return latest
+        # A just-finished launch whose app is still up counts as the same request
+        if (action in LAUNCH_ACTIONS and latest.state == "succeeded"
+                and time.time() - latest.finished_at < self.dedupe_window
+                and self.controller is not None
+                and self.controller.children.running(owner=latest.job_id)):
+            return latest
+        return None
+
+    def _trim_history(self):
+        while len(self._jobs) > self._history:
+            job_id, job = next(iter(self._jobs.items()))
+            if job.active:
+                break
+            del self._jobs[job_id]
+            if self._latest.get((job.action, job.session_id)) is job:
+                del self._latest[job.action, job.session_id]
+
+    def _dispatch(self, action):
+        """Start waiting jobs of an action while it is under its limit (lock held)"""
+        limit = self.action_limits.get(action, 1)
+        waiting = self._waiting[action]
+        while waiting and self._running[action] < limit:
+            job = waiting.popleft()
+            self._running[action] += 1
+            self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        with self._lock:
+            if job.state != "queued":
+                self._release(job.action)
+                return
+            job.state = "running"
+            job.started_at = time.time()
+        try:
+            with self.telemetry.timer("system_job_seconds", job.action):
+                result = self.get_controller().run_action(job.action, job.command, owner=job.job_id)
+            state, error = "succeeded", None
+        except Exception as e:
+            logger.exception("System job %d (%s) failed", job.job_id, job.action,
+                             extra={"job": job.job_id, "action": job.action})
+            state, result, error = "failed", None, f"{job.action} failed: {e}"
+        with self._lock:
+            # A job that already timed out keeps that state
+            if job.state == "running":
+                job._finish(state, result, error)
+                self.stats[state] += 1
+            # The action slot is freed only now, so a hung action never stacks up
+            self._release(job.action)
+
+    def _release(self, action):
+        self._running[action] -= 1
+        self._dispatch(action)
+
+    def _watch(self):
+        """Time out overrunning jobs and reap exited child processes"""
+        while not self._stop_event.wait(0.5):
+            now = time.time()
+            with self._lock:
+                overdue = [job for job in self._jobs.values()
+                           if job.state == "running" and now - job.started_at > self.timeout]
+                for job in overdue:
+                    job._finish("timed_out", error=f"{job.action} timed out after {self.timeout:.0f}s")
+                    self.stats["timed_out"] += 1
+            for job in overdue:
+                logger.warning("System job %d (%s) timed out", job.job_id, job.action,
+                               extra={"job": job.job_id, "action": job.action})
+                if self.controller is not None:
+                    self.controller.children.kill(owner=job.job_id)
+            if self.controller is not None:
+                self.controller.children.reap()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started; returns False once it is running"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != "queued":
+                return False
+            try:
+                self._waiting[job.action].remove(job)
+            except ValueError:
+                pass  # already handed to the pool; _run skips it
+            job._finish("cancelled", error="cancelled")
+            self.stats["cancelled"] += 1
+            return True
+
+    def jobs(self, session_id=None, limit=20):
+        """Newest jobs first, as rows for the UI and the command server"""
+        with self._lock:
+            jobs = [job for job in reversed(self._jobs.values())
+                    if session_id is None or job.session_id == session_id]
+            return [job.as_dict() for job in jobs[:limit]]
+
+    def active_count(self, session_id=None):
+        with self._lock:
+            return sum(1 for job in self._jobs.values()
+                       if job.active and (session_id is None or job.session_id == session_id))
+
+    def summary(self):
+        summary = dict(self.stats)
+        summary["active"] = self.active_count()
+        if self.controller is not None:
+            summary["child_processes"] = len(self.controller.children)
+        return summary
+
+    def shutdown(self):
+        self._stop_event.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+def get_job_scheduler(controller=None, **settings):
+    """Return the job scheduler shared by every session"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = JobScheduler(controller, **settings)
+        elif controller is not None and _shared_scheduler.controller is None:
+            _shared_scheduler.controller = controller
+        return _shared_scheduler
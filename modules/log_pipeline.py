@@ -0,0 +1,237 @@
+"""Asynchronous, structured logging for every JARVIS component.
+
+Log calls only put the record on a bounded queue. One background listener
+thread formats it as a JSON line, writes it and rotates the file. Rotation
+happens at midnight or at a size limit, and the listener gzips rotated
+files. DEBUG records from chatty loggers can be sampled before they are
+queued. Fields bound with log_context(), e.g. the session id, are attached
+to every record logged inside the block.
+"""
+
+import atexit
+import collections
+import contextlib
+import contextvars
+import copy
+import datetime
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+# Record attributes that belong to logging itself, not to structured fields
+_STANDARD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_context_fields = contextvars.ContextVar("jarvis_log_context", default=None)
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Attach fields (session_id, intent, ...) to every record logged inside the block"""
+    current = _context_fields.get()
+    token = _context_fields.set({**current, **fields} if current else fields)
+    try:
+        yield
+    finally:
+        _context_fields.reset(token)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any structured fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keep a fixed fraction of low-level records per logger prefix, e.g. {"JARVIS.speech": 0.1}
+
+    Sampling is deterministic (every 1/rate-th record) so bursts thin out
+    evenly, and records at or above max_level are always kept.
+    """
+
+    def __init__(self, rates, max_level=logging.DEBUG):
+        super().__init__()
+        # Longest prefix first so "JARVIS.speech.vad" beats "JARVIS.speech"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self.max_level = max_level
+        self._seen = collections.Counter()
+        self.dropped = collections.Counter()
+        # Records are filtered on whichever thread logs them
+        self._lock = threading.Lock()
+
+    def _rate(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return prefix, rate
+        return None, 1.0
+
+    def filter(self, record):
+        if record.levelno > self.max_level or not self.rates:
+            return True
+        prefix, rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        with self._lock:
+            seen = self._seen[prefix] = self._seen[prefix] + 1
+            if rate > 0 and int(seen * rate) != int((seen - 1) * rate):
+                return True
+            self.dropped[prefix] += 1
+        return False
+
+    def dropped_total(self):
+        with self._lock:
+            return sum(self.dropped.values())
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue without blocking; a full queue drops the record instead of stalling the caller"""
+
+    def __init__(self, log_queue, limit):
+        super().__init__(log_queue)
+        self.limit = limit
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args now, while they still hold their current values; the
+        # JSON formatting itself waits for the listener thread. Like the
+        # stdlib handler, work on a copy so other handlers see the original
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        fields = _context_fields.get()
+        if fields:
+            for key, value in fields.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return record
+
+    def enqueue(self, record):
+        # SimpleQueue is lock-free for the caller; the bound is checked by hand
+        if self.queue.qsize() >= self.limit:
+            self.dropped += 1
+            return
+        self.queue.put(record)
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-capped log file that also rolls over at midnight and gzips rotated files"""
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=14,
+                 rotate_at_midnight=True, compress=True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_at_midnight = rotate_at_midnight
+        self.compress = compress
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = _gzip_rotator
+        self.rollover_at = self._next_midnight()
+
+    @staticmethod
+    def _next_midnight():
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        return datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+
+    def shouldRollover(self, record):
+        if self.rotate_at_midnight and record.created >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        if self.stream is None and not os.path.exists(self.baseFilename):
+            self.rollover_at = self._next_midnight()
+            return
+        super().doRollover()
+        self.rollover_at = self._next_midnight()
+
+def _gzip_rotator(source, destination):
+    with open(source, 'rb') as f_in, gzip.open(destination, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class LogPipeline:
+    """Root-logger QueueHandler plus the listener thread that owns the real handlers"""
+
+    def __init__(self, directory="logs", filename="jarvis.log", level="INFO", queue_size=10000,
+                 max_bytes=10 * 1024 * 1024, backup_count=14, rotate_at_midnight=True,
+                 compress=True, console=True, sample_rates=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+        self.queue = queue.SimpleQueue()
+
+        self.file_handler = CompressingRotatingFileHandler(
+            self.directory / filename, max_bytes, backup_count, rotate_at_midnight, compress
+        )
+        self.file_handler.setFormatter(JsonFormatter())
+        handlers = [self.file_handler]
+        if console:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            handlers.append(console_handler)
+
+        self.sampler = SamplingFilter(sample_rates or {})
+        self.queue_handler = _QueueHandler(self.queue, queue_size)
+        self.queue_handler.addFilter(self.sampler)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._installed = False
+
+    def install(self):
+        """Route the root logger through the queue and start the writer thread"""
+        if self._installed:
+            return
+        root = logging.getLogger()
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        self._installed = True
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush queued records and stop the writer thread"""
+        if not self._installed:
+            return
+        self._installed = False
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "dropped_queue_full": self.queue_handler.dropped,
+            "sampled_out": self.sampler.dropped_total()
+        }
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_log_pipeline():
+    """The installed pipeline, or None before setup_logging() has run"""
+    return _pipeline
+
+def install_pipeline(**settings):
+    """Install the process-wide pipeline once; later calls return the same one"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline(**settings)
+            _pipeline.install()
+        return _pipeline
@@ -0,0 +1,146 @@
+import enum
+import json
+import os
+import sys
+import time
+import weakref
+from array import array
+from pathlib import Path
+
+class Role(enum.IntEnum):
+    """Speaker of a chat message, stored as a single byte"""
+    USER = 0
+    AI = 1
+
+def _remove_spill_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def remove_stale_spills(directory, before):
+    """Delete spill files last written before a timestamp, e.g. by a previous server process"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+    removed = 0
+    for path in directory.glob("*.jsonl"):
+        try:
+            if path.stat().st_mtime < before:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+class Message:
+    """Lightweight view of one stored chat message"""
+    __slots__ = ('role', 'content', 'timestamp')
+
+    def __init__(self, role, content, timestamp):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+
+    def to_dict(self):
+        return {
+            "type": self.role.name.lower(),
+            "content": self.content,
+            "timestamp": self.timestamp
+        }
+
+class MessageStore:
+    """Bounded, array-backed ring of chat messages with spill-to-disk"""
+
+    def __init__(self, capacity=200, spill_path=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._roles = array('b', bytes(capacity))
+        self._timestamps = array('q', bytes(8 * capacity))
+        self._contents = [None] * capacity
+        self._start = 0
+        self._size = 0
+        self.total_count = 0
+        self.spilled_count = 0
+        # The spill file lives only as long as the store, i.e. the session owning it
+        self._remove_spill = weakref.finalize(self, _remove_spill_file, self.spill_path) if self.spill_path else None
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for offset in range(self._size):
+            yield self._message((self._start + offset) % self.capacity)
+
+    def _message(self, slot):
+        return Message(Role(self._roles[slot]), self._contents[slot], self._timestamps[slot])
+
+    def append(self, role, content, timestamp=None):
+        """Add a message, spilling the oldest one to disk when the ring is full"""
+        if isinstance(role, str):
+            role = Role[role.upper()]
+        if timestamp is None:
+            timestamp = time.time()
+
+        if self._size == self.capacity:
+            slot = self._start
+            self._spill(slot)
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+
+        self._roles[slot] = role
+        self._timestamps[slot] = int(timestamp)
+        self._contents[slot] = content
+        self.total_count += 1
+
+    def _spill(self, slot):
+        """Append an evicted message to the spill file"""
+        if self.spill_path is None:
+            return
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self._message(slot).to_dict(), separators=(',', ':')) + "\n")
+        self.spilled_count += 1
+
+    def recent(self, count):
+        """Return up to count of the newest messages, oldest first"""
+        count = min(count, self._size)
+        return [self._message((self._start + self._size - count + offset) % self.capacity)
+                for offset in range(count)]
+
+    def page(self, skip, count):
+        """Return up to count messages ending skip messages before the newest"""
+        end = max(self._size - skip, 0)
+        start = max(end - count, 0)
+        return [self._message((self._start + offset) % self.capacity) for offset in range(start, end)]
+
+    def spilled(self):
+        """Yield messages that were evicted to disk, oldest first"""
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                yield Message(Role[record["type"].upper()], record["content"], record["timestamp"])
+
+    def memory_usage(self):
+        """Return the approximate RAM held by this store in bytes"""
+        size = (sys.getsizeof(self) + sys.getsizeof(self._roles)
+                + sys.getsizeof(self._timestamps) + sys.getsizeof(self._contents))
+        for offset in range(self._size):
+            size += sys.getsizeof(self._contents[(self._start + offset) % self.capacity])
+        return size
+
+    def clear(self):
+        """Remove every message, including spilled ones"""
+        self._contents = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+        self.total_count = 0
+        self.spilled_count = 0
+        if self.spill_path is not None:
+            _remove_spill_file(self.spill_path)
@@ -0,0 +1,194 @@
+import threading
+import time
+
+import numpy as np
+
+METRIC_FIELDS = ("cpu_percent", "memory_percent", "disk_percent", "net_sent_rate", "net_recv_rate")
+
+# Resolution name -> (bucket width in seconds, number of buckets kept)
+RESOLUTIONS = {
+    "1s": (1, 3600),
+    "1m": (60, 1440),
+    "1h": (3600, 720)
+}
+
+class RingSeries:
+    """Fixed-size NumPy ring of timestamped metric rows"""
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._columns = {field: i for i, field in enumerate(self.fields)}
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, len(self.fields)), dtype=np.float32)
+        self.count = 0
+        self.version = 0
+        self._next = 0
+
+    def append(self, timestamp, values):
+        """Write one row, overwriting the oldest when full"""
+        self.timestamps[self._next] = timestamp
+        self.values[self._next] = values
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.version += 1
+
+    def _segments(self):
+        """Chronological slices of the ring"""
+        if self.count < self.capacity:
+            return [slice(0, self.count)]
+        return [slice(self._next, self.capacity), slice(0, self._next)]
+
+    def window(self, since=None, field=None):
+        """Return (timestamps, values) newer than since; copies only if wrapped"""
+        column = slice(None) if field is None else self._columns[field]
+        times, values = [], []
+        for segment in self._segments():
+            segment_times = self.timestamps[segment]
+            start = 0 if since is None else int(np.searchsorted(segment_times, since, side='right'))
+            times.append(segment_times[start:])
+            values.append(self.values[segment][start:, column])
+        if len(times) == 1:
+            return times[0], values[0]
+        return np.concatenate(times), np.concatenate(values)
+
+    def stats(self, field, since=None):
+        """Vectorized min/max/mean/p95 of one field over a window"""
+        _, values = self.window(since, field)
+        if not values.size:
+            return None
+        return {
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "p95": float(np.percentile(values, 95)),
+            "samples": int(values.size)
+        }
+
+class _Rollup:
+    """Averages rows into fixed-width time buckets"""
+
+    def __init__(self, width, field_count):
+        self.width = width
+        self.bucket = None
+        self.total = np.zeros(field_count, dtype=np.float64)
+        self.samples = 0
+
+    def add(self, timestamp, values):
+        """Add a row, returning (bucket start, mean) when a bucket closes"""
+        bucket = int(timestamp // self.width)
+        closed = None
+        if self.bucket is not None and bucket != self.bucket and self.samples:
+            closed = (self.bucket * self.width, self.total / self.samples)
+            self.total = np.zeros_like(self.total)
+            self.samples = 0
+        self.bucket = bucket
+        self.total += values
+        self.samples += 1
+        return closed
+
+class MetricsHistory:
+    """Multi-resolution system metrics history fed from psutil snapshots"""
+
+    def __init__(self, fields=METRIC_FIELDS, resolutions=RESOLUTIONS):
+        self.fields = tuple(fields)
+        self.series = {name: RingSeries(capacity, self.fields)
+                       for name, (_, capacity) in resolutions.items()}
+        ordered = sorted(resolutions.items(), key=lambda item: item[1][0])
+        self._base = ordered[0][0]
+        self._rollups = [(name, _Rollup(width, len(self.fields))) for name, (width, _) in ordered[1:]]
+        self._widths = {name: width for name, (width, _) in resolutions.items()}
+        self._lock = threading.Lock()
+        self._last_network = None
+        self._figures = {}
+
+    def record(self, timestamp, values):
+        """Append a raw sample and cascade it into the coarser rollups"""
+        values = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            self.series[self._base].append(timestamp, values)
+            for name, rollup in self._rollups:
+                closed = rollup.add(timestamp, values)
+                if closed is None:
+                    break
+                timestamp, values = closed
+                self.series[name].append(timestamp, values)
+
+    def record_snapshot(self, snapshot):
+        """Record a SystemSnapshot from the background sampler"""
+        network = snapshot.network
+        sent_rate = recv_rate = 0.0
+        if self._last_network is not None:
+            last_time, last_network = self._last_network
+            elapsed = max(snapshot.timestamp - last_time, 1e-6)
+            sent_rate = (network.bytes_sent - last_network.bytes_sent) / elapsed
+            recv_rate = (network.bytes_recv - last_network.bytes_recv) / elapsed
+        self._last_network = (snapshot.timestamp, network)
+
+        row = {
+            "cpu_percent": snapshot.cpu_percent,
+            "memory_percent": snapshot.memory.percent,
+            "disk_percent": snapshot.disk.percent,
+            "net_sent_rate": sent_rate,
+            "net_recv_rate": recv_rate
+        }
+        self.record(snapshot.timestamp, [row[field] for field in self.fields])
+
+    def resolution_for(self, seconds):
+        """Pick the finest resolution whose ring covers the window"""
+        for name, series in sorted(self.series.items(), key=lambda item: self._widths[item[0]]):
+            if seconds <= self._widths[name] * series.capacity:
+                return name
+        return max(self._widths, key=self._widths.get)
+
+    def stats(self, field, seconds, resolution=None):
+        """Return min/max/mean/p95 of a field over the last seconds"""
+        resolution = resolution or self.resolution_for(seconds)
+        with self._lock:
+            return self.series[resolution].stats(field, time.time() - seconds)
+
+    def window(self, field, seconds, resolution=None):
+        """Return (timestamps, values) of a field over the last seconds"""
+        resolution = resolution or self.resolution_for(seconds)
+        with self._lock:
+            times, values = self.series[resolution].window(time.time() - seconds, field)
+            return times.copy(), values.copy()
+
+    def figure(self, field, seconds, resolution=None):
+        """Return a plotly line chart, rebuilt only when new data arrived"""
+        import plotly.graph_objects as go
+
+        resolution = resolution or self.resolution_for(seconds)
+        key = (field, seconds, resolution)
+        version = self.series[resolution].version
+        cached = self._figures.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        times, values = self.window(field, seconds, resolution)
+        figure = go.Figure(go.Scatter(
+            x=(times + time.localtime().tm_gmtoff).astype('datetime64[s]'),
+            y=values,
+            mode='lines',
+            line=dict(color='#00d4ff')
+        ))
+        figure.update_layout(
+            title=f"{field} ({resolution})",
+            margin=dict(l=10, r=10, t=40, b=10),
+            height=250,
+            template='plotly_dark'
+        )
+        self._figures[key] = (version, figure)
+        return figure
+
+_shared_history = None
+_shared_lock = threading.Lock()
+
+def get_metrics_history(sampler):
+    """Return the process-wide metrics history, subscribed to the sampler"""
+    global _shared_history
+    with _shared_lock:
+        if _shared_history is None:
+            _shared_history = MetricsHistory()
+            sampler.subscribe(_shared_history.record_snapshot)
+        return _shared_history
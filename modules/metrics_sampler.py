@@ -0,0 +1,110 @@
+import collections
+import threading
+import time
+
+import psutil
+
+# cpu_percent(interval=None) over a shorter span is mostly noise, often 0%
+MIN_CPU_INTERVAL = 0.1
+
+SystemSnapshot = collections.namedtuple(
+    "SystemSnapshot",
+    ["timestamp", "cpu_percent", "memory", "disk", "network"]
+)
+
+class SystemSampler:
+    """Background thread that keeps the latest system metrics snapshot"""
+
+    def __init__(self, period=1.0, disk_path='/'):
+        self.period = period
+        self.disk_path = disk_path
+        self._snapshot = None
+        # psutil keeps the previous CPU sample per thread, so each thread tracks its own
+        self._cpu_reads = threading.local()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._subscribers = []
+
+    def start(self):
+        """Start the sampling thread if it is not already running"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+            self._thread.start()
+
+    def subscribe(self, callback):
+        """Call callback with every snapshot taken by the sampling thread"""
+        self._subscribers.append(callback)
+
+    def stop(self):
+        """Stop the sampling thread and wait for it to exit"""
+        self._stop_event.set()
+        with self._start_lock:
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.period + 1)
+
+    def _run(self):
+        # Prime psutil in this thread so its first interval-less cpu_percent is a real delta
+        psutil.cpu_percent(interval=None)
+        self._cpu_reads.at = time.monotonic()
+        while not self._stop_event.wait(self.period):
+            try:
+                snapshot = self.sample_now()
+            except Exception:
+                continue
+            for callback in list(self._subscribers):
+                try:
+                    callback(snapshot)
+                except Exception:
+                    continue
+
+    def sample_now(self):
+        """Take a snapshot and publish it; blocks only when CPU was last read under 0.1 s ago"""
+        snapshot = SystemSnapshot(
+            timestamp=time.time(),
+            cpu_percent=self._cpu_percent(),
+            memory=psutil.virtual_memory(),
+            disk=psutil.disk_usage(self.disk_path),
+            network=psutil.net_io_counters()
+        )
+        # Readers only ever see a complete tuple; rebinding is atomic
+        self._snapshot = snapshot
+        return snapshot
+
+    def _cpu_percent(self):
+        last = getattr(self._cpu_reads, "at", None)
+        if last is None:
+            # First read in this thread: prime psutil's per-thread baseline, then wait a full interval
+            psutil.cpu_percent(interval=None)
+            time.sleep(MIN_CPU_INTERVAL)
+        else:
+            # Sleep out the rest of the interval so the reading covers at least MIN_CPU_INTERVAL
+            since = time.monotonic() - last
+            if since < MIN_CPU_INTERVAL:
+                time.sleep(MIN_CPU_INTERVAL - since)
+        percent = psutil.cpu_percent(interval=None)
+        self._cpu_reads.at = time.monotonic()
+        return percent
+
+    def latest(self, max_age=None):
+        """Return the newest snapshot, resampling inline if older than max_age"""
+        self.start()
+        snapshot = self._snapshot
+        if snapshot is None or (max_age is not None and time.time() - snapshot.timestamp > max_age):
+            snapshot = self.sample_now()
+        return snapshot
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+def get_system_sampler(period=1.0):
+    """Return the process-wide sampler shared by every session"""
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = SystemSampler(period=period)
+        return _shared_sampler
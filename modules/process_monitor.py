@@ -0,0 +1,95 @@
+import heapq
+import threading
+import time
+
+import psutil
+
+SORT_KEYS = ("cpu", "rss")
+
+# Per-process CPU deltas over a shorter span are too coarse to rank by
+MIN_CPU_INTERVAL = 0.5
+
+class ProcessMonitor:
+    """Keeps psutil handles per PID so CPU deltas are real between polls"""
+
+    def __init__(self):
+        self._processes = {}
+        self._lock = threading.Lock()
+        self.baseline_at = None
+
+    def refresh(self):
+        """Add handles for new PIDs and drop handles for exited ones"""
+        pids = set(psutil.pids())
+        for pid in self._processes.keys() - pids:
+            del self._processes[pid]
+        for pid in pids - self._processes.keys():
+            try:
+                process = psutil.Process(pid)
+                # The first cpu_percent call only sets the baseline
+                process.cpu_percent(interval=None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            self._processes[pid] = process
+        if self.baseline_at is None:
+            self.baseline_at = time.monotonic()
+
+    def cpu_ready(self):
+        """True once the first CPU baselines are old enough to rank processes by"""
+        return self.baseline_at is not None and time.monotonic() - self.baseline_at >= MIN_CPU_INTERVAL
+
+    def _sample(self, sort_by):
+        """Yield (value, pid) for every tracked process"""
+        dead = []
+        for pid, process in self._processes.items():
+            try:
+                if sort_by == "cpu":
+                    value = process.cpu_percent(interval=None)
+                else:
+                    value = process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                dead.append(pid)
+                continue
+            except psutil.AccessDenied:
+                continue
+            yield value, pid
+        for pid in dead:
+            self._processes.pop(pid, None)
+
+    def top(self, count=10, sort_by="cpu"):
+        """Return the top processes by CPU percent or resident memory
+
+        Until a second CPU sample exists, processes are ranked by memory and
+        their cpu_percent is None rather than a meaningless 0.
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"sort_by must be one of {SORT_KEYS}")
+        with self._lock:
+            self.refresh()
+            cpu_ready = self.cpu_ready()
+            if not cpu_ready:
+                sort_by = "rss"
+            # Collect into a list first so dead handles are dropped before lookup
+            samples = list(self._sample(sort_by))
+            ranked = heapq.nlargest(count, samples)
+
+            results = []
+            for value, pid in ranked:
+                process = self._processes.get(pid)
+                if process is None:
+                    continue
+                try:
+                    with process.oneshot():
+                        results.append({
+                            "pid": pid,
+                            "name": process.name(),
+                            "cpu_percent": value if sort_by == "cpu" else (
+                                process.cpu_percent(interval=None) if cpu_ready else None
+                            ),
+                            "memory_mb": round(process.memory_info().rss / (1024**2), 1)
+                        })
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+            return results
+
+    def __len__(self):
+        return len(self._processes)
@@ -0,0 +1,36 @@
+import collections
+
+import speech_recognition as sr
+
+class GoogleRecognizer:
+    """Google Web Speech API backend (network)"""
+
+    def __init__(self, recognizer=None, language="en-US"):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+class SphinxRecognizer:
+    """CMU Sphinx backend (offline, needs the pocketsphinx package)"""
+
+    def __init__(self, recognizer=None, language="en-US"):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio, language=self.language)
+
+class ScriptedRecognizer:
+    """Local stand-in that returns prepared transcripts in order, for WAV fixtures"""
+
+    def __init__(self, transcripts=()):
+        self.transcripts = collections.deque(transcripts)
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.calls += 1
+        if not self.transcripts:
+            raise sr.UnknownValueError()
+        return self.transcripts.popleft()
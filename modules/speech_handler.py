@@ -1,23 +1,120 @@
+"""Local-microphone speech pipeline: persistent capture, VAD, wake word, recognition and TTS.
+
+The Streamlit app does not use it. Browsers record with st.audio_input and
+SpeechService transcribes those clips; SpeechHandler is for running JARVIS
+on the machine the microphone is plugged into.
+"""
+
 
 import speech_recognition as sr
-import pyttsx3
 import threading
 import queue
 import time
+import collections
+import functools
 import streamlit as st
+from modules.audio_cache import AudioCache, load_canned_phrases
+from modules.audio_stream import AudioSegment, AudioStream, MicrophoneSource
+from modules.recognizers import GoogleRecognizer
+from modules.telemetry import get_telemetry
+from modules.tts_worker import PRIORITY_NORMAL, TTSWorker
+from modules.voice_activity import VoiceActivityDetector, read_wav
+from modules.wake_word import WakeWordGate
 
 class SpeechHandler:
-    def __init__(self):
+    def __init__(self, recognition_workers=2, max_pending_segments=8,
+                 recognizer_backend=None, use_vad=True, voice_settings=None,
+                 audio_cache=None, prewarm_phrases=True, wake_word_spotter=None,
+                 wake_word_timeout=8.0, audio_source=None, buffer_seconds=30.0):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.tts_engine = self.initialize_tts()
+        self.recognizer_backend = recognizer_backend or GoogleRecognizer(self.recognizer)
+        self.vad = VoiceActivityDetector() if use_vad else None
+        self.telemetry = get_telemetry()
+        
+        # Wake-word gate: only the utterance after the wake word is recognized
+        self.wake_word_spotter = wake_word_spotter
+        self.wake_word_gate = WakeWordGate(wake_word_spotter, wake_word_timeout) if wake_word_spotter else None
+        
+        # One persistent input stream (microphone by default), opened on first use
+        self.audio_source = audio_source
+        self.buffer_seconds = buffer_seconds
+        self.audio_stream = None
+        self._stream_lock = threading.Lock()
+        
+        # The TTS engine is also started on first use
+        self.tts_engine = None
+        self.tts_worker = None
+        self._tts_started = False
+        self._tts_lock = threading.Lock()
+        self._voice_settings = voice_settings
+        self._audio_cache = audio_cache
+        self._prewarm_phrases = prewarm_phrases
         self.is_listening = False
         self.audio_queue = queue.Queue()
         
-    def initialize_tts(self):
+        # Continuous listening pipeline: capture -> segment_queue -> workers
+        self.recognition_workers = recognition_workers
+        self.segment_queue = queue.Queue(maxsize=max_pending_segments)
+        self._threads = []
+        self._pipeline_lock = threading.Lock()
+        self._pending_results = {}
+        self._next_emit = 0
+        self._latencies = collections.deque(maxlen=200)
+        self.pipeline_stats = collections.Counter()
+        
+    def open_stream(self):
+        """Open the persistent input stream once; later listens reuse it"""
+        with self._stream_lock:
+            if self.audio_stream is None or not self.audio_stream.running:
+                self.audio_stream = AudioStream(self.audio_source or MicrophoneSource(), self.buffer_seconds)
+                self.audio_stream.start()
+            return self.audio_stream
+    
+    def close(self):
+        """Stop listening and release the input device"""
+        self.stop_continuous_listening()
+        with self._stream_lock:
+            if self.audio_stream is not None:
+                self.audio_stream.stop()
+                self.audio_stream = None
+    
+    def start_tts(self):
+        """Initialize the TTS engine and worker once, on first speech"""
+        with self._tts_lock:
+            if not self._tts_started:
+                self._tts_started = True
+                # The engine is created on the worker thread, which then owns it
+                worker = TTSWorker(
+                    functools.partial(self.initialize_tts, self._voice_settings),
+                    self._audio_cache or AudioCache()
+                )
+                if worker.start():
+                    self.tts_worker = worker
+                    self.tts_engine = worker.engine
+                    if self._prewarm_phrases:
+                        # Canned responses render on the worker thread at low priority
+                        self.tts_worker.prewarm(load_canned_phrases())
+                else:
+                    st.error("Text-to-speech engine not available")
+        return self.tts_worker
+    
+    def initialize_tts(self, voice_settings=None):
         """Initialize text-to-speech engine"""
         try:
+            import pyttsx3
             engine = pyttsx3.init()
+            if voice_settings:
+                # voice_settings from user_preferences.json
+                if "rate" in voice_settings:
+                    engine.setProperty('rate', voice_settings["rate"])
+                if "volume" in voice_settings:
+                    engine.setProperty('volume', voice_settings["volume"])
+                voices = engine.getProperty('voices')
+                voice_id = voice_settings.get("voice_id")
+                if voices and isinstance(voice_id, int) and 0 <= voice_id < len(voices):
+                    engine.setProperty('voice', voices[voice_id].id)
+                return engine
+            
             # Set properties
             rate = engine.getProperty('rate')
             engine.setProperty('rate', rate - 50)  # Slower speech
@@ -27,14 +124,12 @@ class SpeechHandler:
             
             return engine
         except:
-            st.error("Text-to-speech engine not available")
             return None
     
     def calibrate_microphone(self):
-        """Calibrate microphone for ambient noise"""
+        """Open the input stream; its noise floor then adapts continuously"""
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source)
+            self.open_stream()
             return True
         except:
             return False
@@ -42,50 +137,212 @@ class SpeechHandler:
     def listen_for_speech(self, timeout=5):
         """Listen for speech input"""
         try:
-            with self.microphone as source:
-                st.info("🎤 Listening...")
-                audio = self.recognizer.listen(source, timeout=timeout)
-                
+            stream = self.open_stream()
+        except Exception as e:
+            return f"Could not open audio input; {e}"
+        # Only speech that starts from now on is an answer to this call
+        stream.clear()
+        st.info("🎤 Listening...")
+        segment = stream.next_segment(timeout)
+        if segment is None:
+            return "Timeout - no speech detected"
+        try:
             # Recognize speech
-            text = self.recognizer.recognize_google(audio)
+            if self.vad and not self.vad.contains_speech(segment.samples, segment.sample_rate):
+                return "Could not understand audio"
+            text = self._recognize(segment)
             return text
-        except sr.WaitTimeoutError:
-            return "Timeout - no speech detected"
         except sr.UnknownValueError:
             return "Could not understand audio"
         except sr.RequestError as e:
             return f"Could not request results; {e}"
     
+    def transcribe_file(self, path, require_wake_word=False):
+        """Run VAD, optional wake-word gating and recognition on a WAV file, e.g. a recorded fixture"""
+        segment = AudioSegment.from_samples(*read_wav(path))
+        if self.vad and not self.vad.contains_speech(segment.samples, segment.sample_rate):
+            return None
+        if require_wake_word and self._wake_word_enabled():
+            # A file stands alone, so it must carry both the wake word and the command
+            gate = WakeWordGate(self.wake_word_spotter)
+            status, offset = gate.check(segment.samples, segment.sample_rate, 0.0, self._has_speech)
+            if status != "command":
+                return None
+            segment = segment.after(offset)
+        try:
+            return self._recognize(segment)
+        except sr.UnknownValueError:
+            return None
+    
+    def _recognize(self, segment):
+        """Run the recognizer backend on a segment, recording its latency and outcome"""
+        backend = type(self.recognizer_backend).__name__
+        try:
+            with self.telemetry.timer("speech_recognition_seconds", backend):
+                text = self.recognizer_backend.recognize(segment.audio_data())
+        except sr.UnknownValueError:
+            self.telemetry.increment("speech_results_total", "unrecognized")
+            raise
+        except Exception:
+            self.telemetry.increment("speech_results_total", "error")
+            raise
+        self.telemetry.increment("speech_results_total", "recognized")
+        return text
+    
     def speak_text(self, text):
-        """Convert text to speech"""
-        if self.tts_engine:
-            try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
-            except:
-                st.error("Could not synthesize speech")
-        else:
-            st.info(f"JARVIS would say: {text}")
+        """Convert text to speech without blocking the caller"""
+        if self.start_tts():
+            return self.speak_async(text)
+        st.info(f"JARVIS would say: {text}")
+        return None
+    
+    def speak_async(self, text, priority=PRIORITY_NORMAL, interrupt=True):
+        """Queue text on the TTS worker; a new response barges in by default"""
+        if not self.start_tts():
+            return None
+        return self.tts_worker.submit(text, priority=priority, interrupt=interrupt)
+    
+    def cancel(self):
+        """Stop speaking queued responses"""
+        if self.tts_worker:
+            self.tts_worker.cancel()
+    
+    def get_tts_metrics(self):
+        """Get TTS queue depth and time-to-first-audio"""
+        return self.tts_worker.metrics() if self.tts_worker else {}
     
     def start_continuous_listening(self):
         """Start continuous speech recognition in background"""
+        if self.is_listening:
+            return
+        # Let threads from a previous run drain before resetting state
+        for thread in self._threads:
+            thread.join(timeout=2)
+        
+        with self._pipeline_lock:
+            self._pending_results = {}
+            self._next_emit = 0
         self.is_listening = True
-        threading.Thread(target=self._continuous_listen, daemon=True).start()
+        self._threads = [threading.Thread(target=self._continuous_listen, name="speech-capture", daemon=True)]
+        for i in range(self.recognition_workers):
+            self._threads.append(
+                threading.Thread(target=self._recognition_worker, name=f"speech-recognizer-{i}", daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
     
     def stop_continuous_listening(self):
         """Stop continuous speech recognition"""
         self.is_listening = False
     
     def _continuous_listen(self):
-        """Continuous listening loop"""
-        while self.is_listening:
+        """Capture stage: take utterances from the persistent stream and queue them"""
+        sequence = 0
+        try:
+            stream = self.open_stream()
+            while self.is_listening:
+                segment = stream.next_segment(timeout=1)
+                if segment is None:
+                    if stream.finished.is_set():
+                        # A file source ran out; let the workers drain and stop
+                        break
+                    continue
+                
+                if self.vad and not self.vad.contains_speech(segment.samples, segment.sample_rate):
+                    # Silence and background noise never reach the recognizer
+                    self._count("gated")
+                    continue
+                if self._wake_word_enabled():
+                    segment = self._gate_on_wake_word(segment)
+                    if segment is None:
+                        continue
+                try:
+                    self.segment_queue.put_nowait((sequence, segment.captured_at, segment))
+                except queue.Full:
+                    # Recognition is falling behind; drop rather than stall capture
+                    self._count("dropped")
+                    continue
+                self._count("captured")
+                sequence += 1
+        except Exception:
+            self._count("capture_errors")
+        self.is_listening = False
+    
+    def _wake_word_enabled(self):
+        return self.wake_word_gate is not None and self.wake_word_gate.spotter.configured
+    
+    def _gate_on_wake_word(self, segment):
+        """Return the segment to recognize for a captured utterance, or None to skip it"""
+        status, offset = self.wake_word_gate.check(
+            segment.samples, segment.sample_rate, segment.captured_at, self._has_speech
+        )
+        if status == "rejected":
+            self._count("wake_word_rejected")
+            return None
+        if status == "follow_up":
+            return segment
+        self._count("wake_word_detected")
+        # "Hey JARVIS, what time is it" in one breath carries the command along
+        return segment.after(offset) if status == "command" else None
+    
+    def _has_speech(self, samples, sample_rate):
+        return self.vad is None or self.vad.contains_speech(samples, sample_rate)
+    
+    def _recognition_worker(self):
+        """Recognition stage: turn queued audio segments into text"""
+        while self.is_listening or not self.segment_queue.empty():
             try:
-                speech_text = self.listen_for_speech(timeout=1)
-                if speech_text and not speech_text.startswith("Timeout") and not speech_text.startswith("Could not"):
-                    self.audio_queue.put(speech_text)
-                time.sleep(0.1)
-            except:
+                sequence, captured_at, segment = self.segment_queue.get(timeout=0.5)
+            except queue.Empty:
                 continue
+            
+            text = None
+            try:
+                if not segment.valid():
+                    # Queued so long that the ring buffer wrapped over it
+                    self._count("overrun")
+                    self._emit_in_order(sequence, None, captured_at)
+                    continue
+                text = self._recognize(segment)
+                self._count("recognized")
+            except sr.UnknownValueError:
+                self._count("unrecognized")
+            except Exception:
+                self._count("recognition_errors")
+            self._emit_in_order(sequence, text, captured_at)
+    
+    def _emit_in_order(self, sequence, text, captured_at):
+        """Release results to audio_queue in capture order"""
+        with self._pipeline_lock:
+            self._pending_results[sequence] = (text, captured_at)
+            while self._next_emit in self._pending_results:
+                text, captured_at = self._pending_results.pop(self._next_emit)
+                if text:
+                    self.audio_queue.put(text)
+                    self._latencies.append(time.monotonic() - captured_at)
+                self._next_emit += 1
+    
+    def _count(self, name):
+        with self._pipeline_lock:
+            self.pipeline_stats[name] += 1
+    
+    def get_pipeline_metrics(self):
+        """Get queue depth, throughput counters and end-to-end latency"""
+        with self._pipeline_lock:
+            latencies = sorted(self._latencies)
+            metrics = dict(self.pipeline_stats)
+            metrics["results_waiting_for_order"] = len(self._pending_results)
+        if self._wake_word_enabled():
+            metrics["wake_word_cpu_per_audio_second"] = round(self.wake_word_spotter.real_time_factor(), 4)
+        if self.audio_stream is not None:
+            for name, value in self.audio_stream.metrics().items():
+                metrics[f"stream_{name}"] = value
+        metrics["queue_depth"] = self.segment_queue.qsize()
+        metrics["results_ready"] = self.audio_queue.qsize()
+        if latencies:
+            metrics["latency_ms_mean"] = round(sum(latencies) / len(latencies) * 1000, 1)
+            metrics["latency_ms_p95"] = round(latencies[int(len(latencies) * 0.95)] * 1000, 1)
+        return metrics
     
     def get_speech_from_queue(self):
         """Get recognized speech from queue"""
@@ -0,0 +1,428 @@
+"""Out-of-process speech recognition shared by every UI session.
+
+Worker processes run VAD, wake-word gating and recognition, so none of it
+competes with Streamlit reruns for the server's GIL. Audio travels through
+one shared-memory block split into fixed slots; only small job and result
+tuples cross the IPC queues. Each session sticks to one worker, which keeps
+that session's VAD noise floor and wake-word state. The wake word travels
+with each job, so one pool serves every wake-word preference. Sessions idle
+for longer than session_idle_timeout are forgotten.
+"""
+
+import atexit
+import collections
+import concurrent.futures
+import importlib
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from modules.telemetry import get_telemetry
+from modules.voice_activity import read_wav
+
+MAX_SAMPLE_RATE = 48000
+HEARTBEAT_INTERVAL = 1.0
+MAX_SESSION_STATES = 256
+SESSION_RESULT_LIMIT = 16
+
+logger = logging.getLogger("JARVIS.speech.service")
+
+class SpeechServiceBusy(RuntimeError):
+    """Raised when every shared audio slot is in use"""
+
+def build_recognizer(spec):
+    """Recognizer backend from "google", "sphinx" or a "module:factory" path"""
+    if spec == "google":
+        from modules.recognizers import GoogleRecognizer
+        return GoogleRecognizer()
+    if spec == "sphinx":
+        from modules.recognizers import SphinxRecognizer
+        return SphinxRecognizer()
+    module_name, _, factory = spec.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+def _attach_shared_memory(name):
+    """Attach to the parent's block without registering it for cleanup a second time"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track flag. Spawned workers share the parent's
+        # resource tracker, so the duplicate registration is harmless there
+        return shared_memory.SharedMemory(name=name)
+
+class _SessionState:
+    __slots__ = ('vad', 'gate')
+
+    def __init__(self, vad):
+        self.vad = vad
+        self.gate = None
+
+def _transcribe(samples, sample_rate, state, recognizer):
+    """Return (status, text) for one utterance of one session"""
+    import speech_recognition as sr
+
+    if not state.vad.contains_speech(samples, sample_rate):
+        return "no_speech", None
+    if state.gate is not None:
+        status, offset = state.gate.check(samples, sample_rate, time.monotonic(), state.vad.contains_speech)
+        if status == "rejected":
+            return "no_wake_word", None
+        if status == "awake":
+            return "awake", None
+        samples = samples[int(offset * sample_rate):]
+    try:
+        return "ok", recognizer.recognize(sr.AudioData(samples.tobytes(), sample_rate, 2))
+    except sr.UnknownValueError:
+        return "unrecognized", None
+
+def _worker_main(worker_id, shm_name, slot_samples, requests, results, recognizer_spec, wake_word_timeout):
+    """Entry point of a speech worker process"""
+    from modules.voice_activity import VoiceActivityDetector
+    from modules.wake_word import WakeWordGate, WakeWordSpotter
+
+    memory = _attach_shared_memory(shm_name)
+    recognizer = build_recognizer(recognizer_spec)
+    spotters = {}
+    sessions = collections.OrderedDict()
+    last_heartbeat = 0.0
+
+    try:
+        while True:
+            now = time.monotonic()
+            if now - last_heartbeat >= HEARTBEAT_INTERVAL:
+                results.put(("heartbeat", worker_id, os.getpid(), None))
+                last_heartbeat = now
+            try:
+                job = requests.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                continue
+            if job is None:
+                break
+            if job[0] == "discard":
+                sessions.pop(job[1], None)
+                continue
+
+            job_id, session_id, slot, length, sample_rate, wake_word = job
+            started = time.perf_counter()
+            state = sessions.get(session_id)
+            if state is None:
+                state = sessions[session_id] = _SessionState(VoiceActivityDetector())
+                if len(sessions) > MAX_SESSION_STATES:
+                    sessions.popitem(last=False)
+            else:
+                sessions.move_to_end(session_id)
+            if wake_word not in spotters:
+                spotter = WakeWordSpotter(wake_word) if wake_word else None
+                # Without enrolled templates every utterance is recognized
+                spotters[wake_word] = spotter if spotter is not None and spotter.configured else None
+            spotter = spotters[wake_word]
+            if spotter is None:
+                state.gate = None
+            elif state.gate is None or state.gate.spotter is not spotter:
+                state.gate = WakeWordGate(spotter, wake_word_timeout)
+
+            # A view straight into the shared block; no copy until AudioData
+            samples = np.ndarray((length,), dtype=np.int16, buffer=memory.buf, offset=slot * slot_samples * 2)
+            try:
+                status, text = _transcribe(samples, sample_rate, state, recognizer)
+            except Exception as e:
+                status, text = "error", str(e)
+            del samples
+            results.put(("result", worker_id, job_id, (status, text, time.perf_counter() - started)))
+    finally:
+        memory.close()
+
+class _Worker:
+    """Parent-side handle and health record of one worker process"""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.process = None
+        self.requests = None
+        self.pid = None
+        self.started_at = None
+        self.last_heartbeat = None
+        self.in_flight = set()
+        self.jobs = 0
+        self.errors = 0
+        self.crashes = 0
+        self.latencies = collections.deque(maxlen=500)
+
+class SpeechService:
+    """Pool of speech worker processes fed through a shared-memory audio buffer"""
+
+    def __init__(self, workers=2, slots=8, slot_seconds=15, recognizer="google", wake_word=None,
+                 wake_word_timeout=8.0, job_timeout=30.0, submit_timeout=5.0, session_idle_timeout=1800.0):
+        self.recognizer = recognizer
+        self.wake_word = wake_word
+        self.wake_word_timeout = wake_word_timeout
+        self.job_timeout = job_timeout
+        self.submit_timeout = submit_timeout
+        self.session_idle_timeout = session_idle_timeout
+        self.slot_samples = int(slot_seconds * MAX_SAMPLE_RATE)
+        self.telemetry = get_telemetry()
+
+        # spawn, not fork: the Streamlit server is full of threads
+        self._context = multiprocessing.get_context("spawn")
+        self._memory = shared_memory.SharedMemory(create=True, size=slots * self.slot_samples * 2)
+        self._free_slots = queue.Queue()
+        for slot in range(slots):
+            self._free_slots.put(slot)
+        self._results = self._context.Queue()
+        self._jobs = {}
+        self._job_ids = itertools.count()
+        self._sessions = {}
+        self._session_seen = {}
+        self._session_results = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._workers = [_Worker(worker_id) for worker_id in range(workers)]
+        for worker in self._workers:
+            self._start_worker(worker)
+        self._collector = threading.Thread(target=self._collect, name="speech-service-results", daemon=True)
+        self._collector.start()
+        self._monitor = threading.Thread(target=self._watch, name="speech-service-monitor", daemon=True)
+        self._monitor.start()
+        atexit.register(self.close)
+
+    def _start_worker(self, worker):
+        worker.requests = self._context.Queue()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(worker.worker_id, self._memory.name, self.slot_samples, worker.requests, self._results,
+                  self.recognizer, self.wake_word_timeout),
+            name=f"speech-worker-{worker.worker_id}",
+            daemon=True
+        )
+        worker.process.start()
+        worker.pid = worker.process.pid
+        worker.started_at = time.monotonic()
+        worker.last_heartbeat = None
+
+    def _route(self, session_id):
+        """The session's worker, assigning the least busy live one on first use"""
+        worker_id = self._sessions.get(session_id)
+        if worker_id is None:
+            counts = collections.Counter(self._sessions.values())
+            worker = min(self._workers, key=lambda w: (not w.process.is_alive(), len(w.in_flight),
+                                                       counts[w.worker_id]))
+            self._sessions[session_id] = worker.worker_id
+            return worker
+        return self._workers[worker_id]
+
+    def submit(self, session_id, samples, sample_rate, wake_word=None):
+        """Queue one utterance; returns a Future resolving to a result dict
+
+        wake_word overrides the service default for this utterance; "" turns
+        the wake-word gate off.
+        """
+        if self._closed.is_set():
+            raise RuntimeError("speech service is closed")
+        samples = np.asarray(samples, dtype=np.int16)
+        if len(samples) > self.slot_samples:
+            raise ValueError(f"utterance is longer than a {self.slot_samples}-sample audio slot")
+        try:
+            slot = self._free_slots.get(timeout=self.submit_timeout)
+        except queue.Empty:
+            raise SpeechServiceBusy("all speech audio slots are busy")
+
+        offset = slot * self.slot_samples
+        np.ndarray((self.slot_samples,), dtype=np.int16, buffer=self._memory.buf,
+                   offset=offset * 2)[:len(samples)] = samples
+        future = concurrent.futures.Future()
+        with self._lock:
+            job_id = next(self._job_ids)
+            worker = self._route(session_id)
+            worker.in_flight.add(job_id)
+            self._session_seen[session_id] = time.monotonic()
+            self._jobs[job_id] = (future, session_id, slot, worker.worker_id, time.monotonic())
+            worker.requests.put((job_id, session_id, slot, len(samples), sample_rate,
+                                 self.wake_word if wake_word is None else wake_word))
+        return future
+
+    def transcribe(self, session_id, samples, sample_rate, timeout=None, wake_word=None):
+        """Submit an utterance and wait for its result dict"""
+        return self.submit(session_id, samples, sample_rate, wake_word).result(timeout or self.job_timeout + 5)
+
+    def transcribe_wav(self, session_id, source, timeout=None, wake_word=None):
+        """transcribe for a 16-bit PCM WAV path or file object"""
+        return self.transcribe(session_id, *read_wav(source), timeout=timeout, wake_word=wake_word)
+
+    def get_result(self, session_id):
+        """Next finished result for a session, or None"""
+        with self._lock:
+            results = self._session_results.get(session_id)
+        if results is None:
+            return None
+        try:
+            return results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def discard_session(self, session_id):
+        """Forget a session's worker, queued results and VAD/wake-word state"""
+        with self._lock:
+            worker_id = self._sessions.pop(session_id, None)
+            self._session_seen.pop(session_id, None)
+            self._session_results.pop(session_id, None)
+        if worker_id is not None and not self._closed.is_set():
+            try:
+                self._workers[worker_id].requests.put(("discard", session_id))
+            except (OSError, ValueError):
+                pass
+
+    def _prune_sessions(self, now):
+        """Drop sessions idle past session_idle_timeout; browser tabs never say goodbye"""
+        with self._lock:
+            idle = [session_id for session_id, seen in self._session_seen.items()
+                    if now - seen > self.session_idle_timeout]
+        for session_id in idle:
+            self.discard_session(session_id)
+
+    def _finish(self, job_id, status, text, worker_seconds=None, error=None):
+        """Resolve a job, free its slot and route the result to its session"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return
+            future, session_id, slot, worker_id, submitted_at = job
+            worker = self._workers[worker_id]
+            worker.in_flight.discard(job_id)
+            worker.jobs += 1
+            latency = time.monotonic() - submitted_at
+            if status == "error":
+                worker.errors += 1
+            else:
+                worker.latencies.append(latency)
+            # A session discarded while its job ran gets no result queue back
+            results = None
+            if session_id in self._sessions:
+                results = self._session_results.setdefault(session_id, queue.Queue(SESSION_RESULT_LIMIT))
+        self._free_slots.put(slot)
+
+        result = {
+            "session_id": session_id,
+            "status": status,
+            "text": text,
+            "error": error,
+            "worker": worker_id,
+            "latency_ms": round(latency * 1000, 1),
+            "worker_ms": round(worker_seconds * 1000, 1) if worker_seconds is not None else None
+        }
+        if error:
+            logger.warning("Speech job failed: %s", error, extra=result)
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Speech job finished", extra=result)
+        self.telemetry.observe("speech_recognition_seconds", "speech_service", latency)
+        self.telemetry.increment("speech_results_total", status)
+        # Callers that wait on the future never drain the session queue; keep only recent results
+        while results is not None:
+            try:
+                results.put_nowait(result)
+                break
+            except queue.Full:
+                try:
+                    results.get_nowait()
+                except queue.Empty:
+                    pass
+        if not future.done():
+            future.set_result(result)
+
+    def _collect(self):
+        while not self._closed.is_set():
+            try:
+                kind, worker_id, key, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if kind == "heartbeat":
+                self._workers[worker_id].last_heartbeat = time.monotonic()
+                continue
+            status, text, worker_seconds = payload
+            error = text if status == "error" else None
+            self._finish(key, status, None if error else text, worker_seconds, error)
+
+    def _watch(self):
+        """Restart crashed or hung workers and fail their in-flight jobs"""
+        while not self._closed.wait(0.5):
+            now = time.monotonic()
+            self._prune_sessions(now)
+            for worker in self._workers:
+                with self._lock:
+                    overdue = [job_id for job_id in worker.in_flight
+                               if now - self._jobs[job_id][4] > self.job_timeout]
+                if overdue and worker.process.is_alive():
+                    # A hung recognizer would hold its slots forever
+                    worker.process.terminate()
+                    worker.process.join(timeout=2)
+                if worker.process.is_alive() or self._closed.is_set():
+                    continue
+                worker.crashes += 1
+                logger.warning("Speech worker %d (pid %s) exited with %s; restarting",
+                               worker.worker_id, worker.pid, worker.process.exitcode,
+                               extra={"worker": worker.worker_id, "exitcode": worker.process.exitcode})
+                with self._lock:
+                    lost = list(worker.in_flight)
+                for job_id in lost:
+                    reason = "timed out" if job_id in overdue else "crashed"
+                    self._finish(job_id, "error", None, error=f"speech worker {reason}")
+                self._start_worker(worker)
+
+    def health(self):
+        """One row per worker: liveness, load, crash count and latency percentiles"""
+        now = time.monotonic()
+        rows = []
+        with self._lock:
+            session_counts = collections.Counter(self._sessions.values())
+            for worker in self._workers:
+                latencies = sorted(worker.latencies)
+                rows.append({
+                    "worker": worker.worker_id,
+                    "pid": worker.pid,
+                    "alive": worker.process.is_alive(),
+                    "sessions": session_counts[worker.worker_id],
+                    "in_flight": len(worker.in_flight),
+                    "jobs": worker.jobs,
+                    "errors": worker.errors,
+                    "crashes": worker.crashes,
+                    "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                    "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+                    "heartbeat_age_s": round(now - worker.last_heartbeat, 1) if worker.last_heartbeat else None
+                })
+        return rows
+
+    def free_slots(self):
+        return self._free_slots.qsize()
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for worker in self._workers:
+            try:
+                worker.requests.put(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        with self._lock:
+            pending = list(self._jobs)
+        for job_id in pending:
+            self._finish(job_id, "error", None, error="speech service closed")
+        self._memory.close()
+        try:
+            self._memory.unlink()
+        except FileNotFoundError:
+            pass
@@ -5,11 +5,90 @@ import platform
 import psutil
 import datetime
 import json
+import threading
+import time
+from modules.job_scheduler import classify_command
+from modules.metrics_sampler import get_system_sampler
+from modules.metrics_history import get_metrics_history
+from modules.process_monitor import ProcessMonitor
+from modules.telemetry import timed
 
-class SystemController:
+class ChildProcesses:
+    """Processes started by the controller, polled so exited ones never linger as zombies"""
+    
     def __init__(self):
+        self._children = []
+        self._lock = threading.Lock()
+    
+    def launch(self, args, label, owner=None, **popen_kwargs):
+        self.reap()
+        process = subprocess.Popen(args, **popen_kwargs)
+        with self._lock:
+            self._children.append((process, label, owner, time.time()))
+        return process
+    
+    def reap(self):
+        """Collect the exit status of finished children; returns (label, returncode) pairs"""
+        with self._lock:
+            children = list(self._children)
+        exited = [child for child in children if child[0].poll() is not None]
+        if exited:
+            with self._lock:
+                self._children = [child for child in self._children if child not in exited]
+        return [(label, process.returncode) for process, label, _, _ in exited]
+    
+    def running(self, owner=None):
+        """Live children, optionally only those started by one owner"""
+        with self._lock:
+            return [process for process, _, child_owner, _ in self._children
+                    if process.poll() is None and (owner is None or child_owner == owner)]
+    
+    def kill(self, owner, grace=2.0):
+        """Terminate an owner's children, killing any that ignore the request"""
+        processes = self.running(owner)
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + grace
+        for process in processes:
+            try:
+                process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        self.reap()
+        return len(processes)
+    
+    def rows(self):
+        with self._lock:
+            return [
+                {"pid": process.pid, "label": label, "job": owner,
+                 "running_s": round(time.time() - started, 1), "returncode": process.returncode}
+                for process, label, owner, started in self._children
+            ]
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._children)
+
+class SystemController:
+    def __init__(self, sample_period=1.0, max_staleness=5.0):
         self.system = platform.system()
-        self.system_info = self.get_system_info()
+        self._system_info = None
+        self.max_staleness = max_staleness
+        self.sampler = get_system_sampler(sample_period)
+        self.metrics_history = get_metrics_history(self.sampler)
+        self.sampler.start()
+        self.process_monitor = ProcessMonitor()
+        # Take CPU baselines now so a later top() can already rank by CPU
+        self.process_monitor.refresh()
+        self.children = ChildProcesses()
+    
+    @property
+    def system_info(self):
+        """Static host details, probed on first use (platform.processor() may shell out)"""
+        if self._system_info is None:
+            self._system_info = self.get_system_info()
+        return self._system_info
     
     def get_system_info(self):
         """Get basic system information"""
@@ -20,81 +99,87 @@ class SystemController:
             "machine": platform.machine(),
             "processor": platform.processor(),
             "cpu_count": psutil.cpu_count(),
-            "memory": psutil.virtual_memory().total // (1024**3)  # GB
+            "memory": psutil.virtual_memory().total // (1024**3),  # GB
+            "boot_time": datetime.datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:%S')
         }
     
+    @timed("system_call_seconds", "execute_command")
     def execute_command(self, command):
         """Execute system commands based on user input"""
-        command_lower = command.lower()
-        
-        if "open calculator" in command_lower or "launch calculator" in command_lower:
-            return self.open_calculator()
-        elif "open notepad" in command_lower or "launch notepad" in command_lower:
-            return self.open_notepad()
-        elif "open browser" in command_lower:
-            return self.open_browser()
-        elif "system info" in command_lower or "system status" in command_lower:
+        return self.run_action(classify_command(command), command)
+    
+    def run_action(self, action, command="", owner=None):
+        """Run one controller action; launched apps are tracked under owner (e.g. a job id)"""
+        if action == "open_calculator":
+            return self.open_calculator(owner)
+        elif action == "open_notepad":
+            return self.open_notepad(owner)
+        elif action == "open_browser":
+            return self.open_browser(owner)
+        elif action == "system_status":
             return self.get_system_status()
         else:
             return f"Command '{command}' not recognized or not implemented in demo mode"
     
-    def open_calculator(self):
+    def open_calculator(self, owner=None):
         """Open system calculator"""
         try:
             if self.system == "Windows":
-                subprocess.Popen("calc.exe")
+                self.children.launch("calc.exe", "calculator", owner)
                 return "Calculator opened successfully"
             elif self.system == "Darwin":  # macOS
-                subprocess.Popen(["open", "-a", "Calculator"])
+                self.children.launch(["open", "-a", "Calculator"], "calculator", owner)
                 return "Calculator opened successfully"
             elif self.system == "Linux":
-                subprocess.Popen(["gnome-calculator"])
+                self.children.launch(["gnome-calculator"], "calculator", owner)
                 return "Calculator opened successfully"
             else:
                 return "Calculator not available for this system"
         except Exception as e:
             return f"Could not open calculator: {str(e)}"
     
-    def open_notepad(self):
+    def open_notepad(self, owner=None):
         """Open system text editor"""
         try:
             if self.system == "Windows":
-                subprocess.Popen("notepad.exe")
+                self.children.launch("notepad.exe", "notepad", owner)
                 return "Notepad opened successfully"
             elif self.system == "Darwin":  # macOS
-                subprocess.Popen(["open", "-a", "TextEdit"])
+                self.children.launch(["open", "-a", "TextEdit"], "notepad", owner)
                 return "TextEdit opened successfully"
             elif self.system == "Linux":
-                subprocess.Popen(["gedit"])
+                self.children.launch(["gedit"], "notepad", owner)
                 return "Text editor opened successfully"
             else:
                 return "Text editor not available for this system"
         except Exception as e:
             return f"Could not open text editor: {str(e)}"
     
-    def open_browser(self):
+    def open_browser(self, owner=None):
         """Open default web browser"""
         try:
             if self.system == "Windows":
-                subprocess.Popen(["start", "chrome"], shell=True)
+                self.children.launch(["start", "chrome"], "browser", owner, shell=True)
                 return "Browser opened successfully"
             elif self.system == "Darwin":  # macOS
-                subprocess.Popen(["open", "-a", "Google Chrome"])
+                self.children.launch(["open", "-a", "Google Chrome"], "browser", owner)
                 return "Browser opened successfully"
             elif self.system == "Linux":
-                subprocess.Popen(["google-chrome"])
+                self.children.launch(["google-chrome"], "browser", owner)
                 return "Browser opened successfully"
             else:
                 return "Browser not available for this system"
         except Exception as e:
             return f"Could not open browser: {str(e)}"
     
+    @timed("system_call_seconds", "get_system_status")
     def get_system_status(self):
         """Get current system status"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            snapshot = self.sampler.latest(self.max_staleness)
+            cpu_percent = snapshot.cpu_percent
+            memory = snapshot.memory
+            disk = snapshot.disk
             
             status = f"""System Status Report:
             
@@ -104,18 +189,21 @@ class SystemController:
 🧠 Memory: {memory.percent}% used ({memory.used // (1024**3)}GB / {memory.total // (1024**3)}GB)
 💾 Disk Usage: {disk.percent}% used ({disk.used // (1024**3)}GB / {disk.total // (1024**3)}GB)
 ⚡ CPU Cores: {self.system_info['cpu_count']}
-🕒 Boot Time: {datetime.datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:%S')}
+🕒 Boot Time: {self.system_info['boot_time']}
             """
             return status
         except Exception as e:
             return f"Could not retrieve system status: {str(e)}"
     
-    def get_running_processes(self):
-        """Get list of running processes"""
+    @timed("system_call_seconds", "get_metric_stats")
+    def get_metric_stats(self, field="cpu_percent", seconds=3600):
+        """Get min/max/mean/p95 of a system metric over a recent window"""
+        return self.metrics_history.stats(field, seconds)
+    
+    @timed("system_call_seconds", "get_running_processes")
+    def get_running_processes(self, count=10, sort_by="cpu"):
+        """Get the top running processes by CPU ("cpu") or memory ("rss")"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-                processes.append(proc.info)
-            return processes[:10]  # Return top 10 processes
+            return self.process_monitor.top(count, sort_by)
         except Exception as e:
             return f"Could not retrieve process list: {str(e)}"
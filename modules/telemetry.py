@@ -0,0 +1,279 @@
+import functools
+import logging
+import os
+import tempfile
+import threading
+import time
+from array import array
+
+# Label key and help text per metric family; unknown names use "label"
+METRIC_FAMILIES = {
+    "jarvis_command_seconds": ("intent", "End-to-end JarvisAI.process_command latency by intent"),
+    "jarvis_handler_seconds": ("handler", "JarvisAI handle_* method latency"),
+    "speech_recognition_seconds": ("backend", "Speech recognizer latency per audio segment"),
+    "speech_results_total": ("outcome", "Speech recognition outcomes"),
+    "system_call_seconds": ("call", "SystemController call latency"),
+    "system_job_seconds": ("action", "Scheduled SystemController action run time")
+}
+
+# Bucket bounds (seconds) used when exporting histograms to Prometheus
+PROMETHEUS_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+logger = logging.getLogger("JARVIS.telemetry")
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of microsecond latencies, about 3% resolution"""
+
+    SUB_BUCKET_BITS = 5
+
+    def __init__(self, max_micros=2 ** 36):
+        self._sub_count = 1 << self.SUB_BUCKET_BITS
+        self._half = self._sub_count >> 1
+        self._max_index = self._index(max_micros)
+        self.counts = array('q', bytes(8 * (self._max_index + 1)))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, micros):
+        """Bucket of a value: exact below 32us, then 16 buckets per power of two"""
+        if micros < self._sub_count:
+            return micros
+        exponent = micros.bit_length() - self.SUB_BUCKET_BITS
+        return self._sub_count + (exponent - 1) * self._half + (micros >> exponent) - self._half
+
+    def _lowest(self, index):
+        """Smallest value that falls into a bucket"""
+        if index < self._sub_count:
+            return index
+        exponent, offset = divmod(index - self._sub_count, self._half)
+        return (offset + self._half) << (exponent + 1)
+
+    def record(self, micros):
+        micros = max(int(micros), 0)
+        self.counts[min(self._index(micros), self._max_index)] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100) in microseconds"""
+        if not self.count:
+            return 0
+        rank = max(int(self.count * q / 100.0 + 0.5), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index == self._max_index:
+                    return self.max
+                # Middle of the bucket halves the worst-case error
+                return min((self._lowest(index) + self._lowest(index + 1) - 1) // 2, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds_micros):
+        """Counts of values at or below each bound, for Prometheus buckets"""
+        results = []
+        seen = 0
+        index = 0
+        for bound in bounds_micros:
+            last = min(self._index(int(bound)), self._max_index)
+            while index <= last:
+                seen += self.counts[index]
+                index += 1
+            results.append(seen)
+        return results
+
+class _NullTimer:
+    """Timer returned while telemetry is off; entering and leaving it does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ('telemetry', 'name', 'label', 'started')
+
+    def __init__(self, telemetry, name, label):
+        self.telemetry = telemetry
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.observe(self.name, self.label, time.perf_counter() - self.started)
+        return False
+
+class Telemetry:
+    """Process-wide latency histograms and counters with a global on/off switch"""
+
+    def __init__(self, enabled=True, slow_threshold=1.0):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._stop_event = threading.Event()
+
+    def observe(self, name, label, seconds):
+        """Record one latency sample in seconds"""
+        if not self.enabled:
+            return
+        key = (name, label)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(seconds * 1e6)
+        if seconds >= self.slow_threshold:
+            logger.warning("Slow %s{%s}: %.0f ms", name, label, seconds * 1000,
+                           extra={"metric": name, "label": label, "latency_ms": round(seconds * 1000, 1)})
+
+    def increment(self, name, label, amount=1):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = (name, label)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def timer(self, name, label):
+        """Context manager recording the time spent in its block"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, label)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def summary(self):
+        """One row per histogram: count and latency percentiles in milliseconds"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            rows = []
+            for (name, label), histogram in items:
+                rows.append({
+                    "metric": name,
+                    "label": label,
+                    "count": histogram.count,
+                    "mean_ms": round(histogram.total / histogram.count / 1000, 3),
+                    "p50_ms": round(histogram.percentile(50) / 1000, 3),
+                    "p95_ms": round(histogram.percentile(95) / 1000, 3),
+                    "p99_ms": round(histogram.percentile(99) / 1000, 3),
+                    "max_ms": round(histogram.max / 1000, 3)
+                })
+        return rows
+
+    def counters(self):
+        with self._lock:
+            return {f"{name}{{{label}}}": value for (name, label), value in sorted(self._counters.items())}
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        bounds_micros = [bound * 1e6 for bound in PROMETHEUS_BUCKETS]
+        lines = []
+        with self._lock:
+            families = {}
+            for (name, label), histogram in sorted(self._histograms.items()):
+                families.setdefault(name, []).append((label, histogram))
+            for name, entries in families.items():
+                label_key, help_text = METRIC_FAMILIES.get(name, ("label", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for label, histogram in entries:
+                    label_value = _escape_label(label)
+                    cumulative = histogram.cumulative_counts(bounds_micros)
+                    for bound, bucket_count in zip(PROMETHEUS_BUCKETS, cumulative):
+                        lines.append(f'{name}_bucket{{{label_key}="{label_value}",le="{bound}"}} {bucket_count}')
+                    lines.append(f'{name}_bucket{{{label_key}="{label_value}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{label_key}="{label_value}"}} {histogram.total / 1e6:.6f}')
+                    lines.append(f'{name}_count{{{label_key}="{label_value}"}} {histogram.count}')
+
+            families = {}
+            for (name, label), value in sorted(self._counters.items()):
+                families.setdefault(name, []).append((label, value))
+            for name, entries in families.items():
+                label_key, help_text = METRIC_FAMILIES.get(name, ("label", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for label, value in entries:
+                    lines.append(f'{name}{{{label_key}="{_escape_label(label)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically write the metrics file, e.g. for node_exporter's textfile collector"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".prom")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.render_prometheus())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def start_file_export(self, path, interval=15.0):
+        """Rewrite the metrics file every interval seconds on a daemon thread"""
+        if self._exporter is not None and self._exporter.is_alive():
+            return
+
+        def export():
+            while not self._stop_event.wait(interval):
+                if self.enabled:
+                    try:
+                        self.write_prometheus(path)
+                    except OSError as e:
+                        logger.error("Could not write metrics file %s: %s", path, e)
+
+        self._exporter = threading.Thread(target=export, name="metrics-export", daemon=True)
+        self._exporter.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_shared_telemetry = None
+_shared_lock = threading.Lock()
+
+def get_telemetry():
+    """Return the telemetry registry shared by every session"""
+    global _shared_telemetry
+    with _shared_lock:
+        if _shared_telemetry is None:
+            _shared_telemetry = Telemetry(enabled=os.environ.get("JARVIS_TELEMETRY", "1") != "0")
+        return _shared_telemetry
+
+def timed(name, label):
+    """Decorator recording a function's latency; a single flag check when telemetry is off"""
+    def decorator(func):
+        telemetry = get_telemetry()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not telemetry.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                telemetry.observe(name, label, time.perf_counter() - started)
+        return wrapper
+    return decorator
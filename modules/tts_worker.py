@@ -0,0 +1,239 @@
+import collections
+import itertools
+import logging
+import queue
+import re
+import threading
+import time
+
+from modules.audio_cache import AudioCache, WavPlayback
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+logger = logging.getLogger("JARVIS.speech.tts")
+
+def split_sentences(text):
+    """Split a response into sentence-sized chunks for speaking"""
+    return [chunk.strip() for chunk in SENTENCE_BREAK.split(text) if chunk and chunk.strip()]
+
+class TTSWorker:
+    """Dedicated text-to-speech thread fed by a priority queue of sentences
+
+    The engine is built by engine_factory on the worker thread itself:
+    pyttsx3 drivers (SAPI5's COM objects, NSSpeechSynthesizer) belong to
+    the thread that created them.
+    """
+
+    def __init__(self, engine_factory, audio_cache=None, max_tracked_jobs=100, start_timeout=5.0):
+        self.engine_factory = engine_factory
+        self.engine = None
+        self.audio_cache = audio_cache
+        self.max_tracked_jobs = max_tracked_jobs
+        self.start_timeout = start_timeout
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._job_ids = itertools.count(1)
+        self._generation = 0
+        self._jobs = collections.OrderedDict()
+        self._first_audio_times = collections.deque(maxlen=100)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+        self._speaking = False
+        # Barge-in reaches the engine through its own thread; see _on_word
+        self._stop_requested = threading.Event()
+        self._playback = None
+        self._voice_settings = (None, None, None)
+
+    def _read_voice_settings(self):
+        """Current (rate, volume, voice id) used to key cached audio"""
+        try:
+            return (
+                self.engine.getProperty('rate'),
+                self.engine.getProperty('volume'),
+                self.engine.getProperty('voice')
+            )
+        except Exception:
+            return (None, None, None)
+
+    def _cache_key(self, chunk):
+        return AudioCache.key(chunk, *self._voice_settings)
+
+    def start(self):
+        """Start the worker thread once and wait for its engine; False if there is none"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+                self._thread.start()
+        self._ready.wait(self.start_timeout)
+        return self.engine is not None
+
+    def submit(self, text, priority=PRIORITY_NORMAL, interrupt=False):
+        """Queue text for speaking and return a job id without blocking"""
+        if interrupt:
+            self.cancel()
+        available = self.start()
+        chunks = split_sentences(text) if available else []
+        with self._lock:
+            job_id = next(self._job_ids)
+            self._jobs[job_id] = {
+                "status": ("queued" if chunks else "done") if available else "error",
+                "submitted": time.monotonic(),
+                "time_to_first_audio": None,
+                "chunks_left": len(chunks)
+            }
+            while len(self._jobs) > self.max_tracked_jobs:
+                self._jobs.popitem(last=False)
+            generation = self._generation
+            for chunk in chunks:
+                self._queue.put((priority, next(self._sequence), generation, job_id, chunk))
+        return job_id
+
+    def prewarm(self, phrases):
+        """Queue low-priority renders of phrases that are not cached yet"""
+        if self.audio_cache is None or not self.start():
+            return 0
+        queued = 0
+        for phrase in phrases:
+            for chunk in split_sentences(phrase):
+                if self._cache_key(chunk) not in self.audio_cache:
+                    # Render jobs carry no generation so barge-in never drops them
+                    self._queue.put((PRIORITY_LOW, next(self._sequence), None, None, chunk))
+                    queued += 1
+        return queued
+
+    def cancel(self):
+        """Barge-in: drop everything queued and cut off the sentence being spoken"""
+        with self._lock:
+            self._generation += 1
+            for job in self._jobs.values():
+                if job["status"] in ("queued", "speaking"):
+                    job["status"] = "cancelled"
+            if self._speaking:
+                self._stop_requested.set()
+            playback = self._playback
+        if playback is not None:
+            # A cached rendering plays in a separate player, which any thread may stop
+            playback.stop()
+        renders = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] is None:
+                renders.append(item)
+        for item in renders:
+            self._queue.put(item)
+
+    def _run(self):
+        try:
+            self.engine = self.engine_factory()
+        except Exception:
+            self.engine = None
+        if self.engine is not None:
+            self._voice_settings = self._read_voice_settings()
+            # pyttsx3 engines may only be stopped from their own thread, e.g. inside a callback
+            self.engine.connect('started-word', self._on_word)
+        self._ready.set()
+        if self.engine is None:
+            return
+        while True:
+            _, _, generation, job_id, chunk = self._queue.get()
+            if generation is None:
+                self._render(chunk)
+                continue
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if generation != self._generation or job is None:
+                    continue
+                if job["time_to_first_audio"] is None:
+                    job["time_to_first_audio"] = time.monotonic() - job["submitted"]
+                    self._first_audio_times.append(job["time_to_first_audio"])
+                job["status"] = "speaking"
+                self._stop_requested.clear()
+                self._speaking = True
+            try:
+                self._speak(chunk)
+            except Exception:
+                with self._lock:
+                    self._speaking = False
+                    job["status"] = "error"
+                continue
+            with self._lock:
+                self._speaking = False
+                job["chunks_left"] -= 1
+                if job["chunks_left"] == 0 and job["status"] == "speaking":
+                    job["status"] = "done"
+
+    def _on_word(self, name, location, length):
+        """Engine callback on the worker thread: honour a pending barge-in"""
+        if self._stop_requested.is_set():
+            self._stop_requested.clear()
+            self.engine.stop()
+
+    def _speak(self, chunk):
+        """Play a cached rendering if there is one, otherwise synthesize"""
+        if self.audio_cache is not None:
+            path = self.audio_cache.get(self._cache_key(chunk))
+            if path is not None:
+                try:
+                    self._play(path)
+                    return
+                except Exception:
+                    logger.warning("Cached speech playback failed; synthesizing instead", exc_info=True)
+        if self._stop_requested.is_set():
+            return
+        self.engine.say(chunk)
+        self.engine.runAndWait()
+
+    def _play(self, path):
+        with self._lock:
+            if self._stop_requested.is_set():
+                return
+            playback = self._playback = WavPlayback(path)
+        try:
+            playback.wait()
+        finally:
+            with self._lock:
+                self._playback = None
+
+    def _render(self, chunk):
+        """Synthesize a phrase to the audio cache without playing it"""
+        key = self._cache_key(chunk)
+        if key in self.audio_cache:
+            return
+        temp_path = self.audio_cache.temp_path_for(key)
+        try:
+            self.engine.save_to_file(chunk, str(temp_path))
+            self.engine.runAndWait()
+            self.audio_cache.put(key, temp_path)
+        except Exception:
+            pass
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def job_status(self, job_id):
+        """Return a copy of a job's status, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def metrics(self):
+        """Return queue depth and time-to-first-audio statistics"""
+        with self._lock:
+            last = self._first_audio_times[-1] if self._first_audio_times else None
+            times = sorted(self._first_audio_times)
+        metrics = {"queued_sentences": self._queue.qsize()}
+        if self.audio_cache is not None:
+            metrics.update({f"cache_{name}": value for name, value in self.audio_cache.stats().items()})
+        if times:
+            metrics["time_to_first_audio_ms_last"] = round(last * 1000, 1)
+            metrics["time_to_first_audio_ms_mean"] = round(sum(times) / len(times) * 1000, 1)
+            metrics["time_to_first_audio_ms_p95"] = round(times[int(len(times) * 0.95)] * 1000, 1)
+        return metrics
@@ -2,48 +2,51 @@
 import json
 import os
 import datetime
+import functools
 import logging
+import threading
 from pathlib import Path
+from modules.config_service import freeze, get_config_service
+from modules.conversation_log import ConversationLog
+from modules.history_index import HistoryIndex
 
-def setup_logging():
-    """Setup logging configuration"""
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / f"jarvis_{datetime.date.today()}.log"),
-            logging.StreamHandler()
-        ]
-    )
+def setup_logging(settings=None):
+    """Install the queue-based JSON logging pipeline (once per process)"""
+    from modules.log_pipeline import install_pipeline
+    
+    install_pipeline(**{**get_default_config()["logging"], **(settings or {})})
     return logging.getLogger("JARVIS")
 
 def load_config(config_path="config/config.json"):
-    """Load configuration from JSON file"""
+    """Load a read-only configuration snapshot from the shared config cache
+
+    The defaults are frozen too, so callers always get the same type;
+    use thaw() for a copy to modify.
+    """
     try:
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        else:
-            # Return default config if file doesn't exist
-            return get_default_config()
+        config = get_config_service().get(config_path)
+        if config is not None:
+            return config
+        # Return default config if file doesn't exist
+        return frozen_default_config()
     except Exception as e:
         print(f"Error loading config: {e}")
-        return get_default_config()
+        return frozen_default_config()
 
 def save_config(config, config_path="config/config.json"):
-    """Save configuration to JSON file"""
+    """Save configuration to JSON file atomically"""
     try:
-        os.makedirs(os.path.dirname(config_path), exist_ok=True)
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        get_config_service().save(config_path, config)
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
         return False
 
+@functools.lru_cache(maxsize=None)
+def frozen_default_config():
+    """The default configuration, frozen once and shared by every caller"""
+    return freeze(get_default_config())
+
 def get_default_config():
     """Return default configuration"""
     return {
@@ -54,17 +57,47 @@ def get_default_config():
             "enabled": True,
             "wake_word": "jarvis",
             "confidence_threshold": 0.7,
-            "language": "en-US"
+            "language": "en-US",
+            "recognizer": "google",
+            "service_workers": 2,
+            "service_slots": 8
         },
         "ui": {
             "theme": "dark",
             "max_history": 100,
             "auto_scroll": True
         },
+        "history": {
+            "max_records": 250000
+        },
         "system": {
             "auto_start": False,
             "minimize_to_tray": True,
-            "check_updates": True
+            "check_updates": True,
+            # Launch real applications for system commands; off, they get demo replies
+            "execute_actions": False,
+            "job_workers": 4,
+            "job_timeout": 30,
+            "job_dedupe_window": 5,
+            "job_action_limits": {}
+        },
+        "diagnostics": {
+            "metrics_enabled": True,
+            "slow_threshold": 1.0,
+            "prometheus_file": "data/metrics.prom",
+            "export_interval": 15
+        },
+        "logging": {
+            "level": "INFO",
+            "directory": "logs",
+            "filename": "jarvis.log",
+            "queue_size": 10000,
+            "max_bytes": 10485760,
+            "backup_count": 14,
+            "rotate_at_midnight": True,
+            "compress": True,
+            "console": True,
+            "sample_rates": {"JARVIS.engine": 0.1, "JARVIS.speech": 0.1}
         }
     }
 
@@ -129,51 +162,109 @@ def create_directory_structure():
 class ConversationManager:
     """Manage conversation history and context"""
     
-    def __init__(self, max_history=100):
+    def __init__(self, max_history=100, log_dir="data/conversation_log", max_indexed=None):
         self.max_history = max_history
+        # Search reaches further back than the in-memory tail
+        self.max_indexed = max(max_indexed or max_history, max_history)
         self.history_file = "data/conversation_history.json"
+        self.log = ConversationLog(log_dir, max_records=self.max_indexed)
+        self.index = None
+        self._lock = threading.Lock()
         self.load_history()
+        threading.Thread(target=self.build_index, name="history-index", daemon=True).start()
     
     def load_history(self):
-        """Load conversation history from file"""
+        """Load the tail of the conversation log; the search index is rebuilt on demand"""
         try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r') as f:
-                    self.conversations = json.load(f)
-            else:
-                self.conversations = []
+            self.import_legacy_history()
+            conversations = self.log.read_tail(self.max_history)
         except:
-            self.conversations = []
+            conversations = []
+        with self._lock:
+            self.conversations = conversations
+            self.index = None
+    
+    def build_index(self):
+        """Index the searchable window of the log if that has not happened yet"""
+        with self._lock:
+            return self._search_index()
+    
+    def _search_index(self):
+        # Called with the lock held, so no record can reach the log mid-build
+        if self.index is None:
+            index = HistoryIndex()
+            try:
+                for conversation in self.log.read_tail(self.max_indexed):
+                    index.add(conversation)
+            except Exception as e:
+                print(f"Error indexing history: {e}")
+            self.index = index
+        return self.index
+    
+    def import_legacy_history(self):
+        """Move a pre-JSONL history file into the conversation log"""
+        if not os.path.exists(self.history_file) or self.log.segments():
+            return
+        with open(self.history_file, 'r') as f:
+            conversations = json.load(f)
+        for conversation in conversations[-self.max_indexed:]:
+            self.log.append(conversation)
+        self.log.flush()
+        os.replace(self.history_file, self.history_file + ".migrated")
     
     def save_history(self):
-        """Save conversation history to file"""
+        """Flush pending conversation records to disk"""
         try:
-            os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            with open(self.history_file, 'w') as f:
-                json.dump(self.conversations[-self.max_history:], f, indent=2)
+            self.log.flush()
         except Exception as e:
             print(f"Error saving history: {e}")
     
-    def add_conversation(self, user_input, ai_response):
+    def compact_history(self):
+        """Drop log segments older than the searchable window"""
+        return self.log.compact(self.max_indexed)
+    
+    def add_conversation(self, user_input, ai_response, session_id=None):
         """Add new conversation to history"""
         conversation = {
             "timestamp": datetime.datetime.now().isoformat(),
             "user_input": user_input,
             "ai_response": ai_response
         }
-        self.conversations.append(conversation)
-        
-        # Keep only recent conversations
-        if len(self.conversations) > self.max_history:
-            self.conversations = self.conversations[-self.max_history:]
-        
-        self.save_history()
+        if session_id is not None:
+            conversation["session_id"] = session_id
+        with self._lock:
+            self.conversations.append(conversation)
+            
+            # Keep only recent conversations
+            if len(self.conversations) > self.max_history:
+                del self.conversations[:-self.max_history]
+            
+            if self.index is not None:
+                self.index.add(conversation)
+                self.index.evict_to(self.max_indexed)
+            
+            try:
+                self.log.append(conversation)
+            except Exception as e:
+                print(f"Error saving history: {e}")
     
     def get_recent_context(self, num_messages=5):
         """Get recent conversation context"""
         return self.conversations[-num_messages:] if self.conversations else []
     
+    def search_history(self, keywords=None, start=None, end=None, limit=20, session_id=None):
+        """Find past conversations by keyword and time range, newest first"""
+        with self._lock:
+            return self._search_index().search(keywords, start, end, limit, session_id)
+    
+    def query_history(self, text, limit=20, session_id=None):
+        """Search history with free text such as 'weather last week'"""
+        with self._lock:
+            return self._search_index().query(text, limit, session_id=session_id)
+    
     def clear_history(self):
         """Clear conversation history"""
-        self.conversations = []
-        self.save_history()
+        with self._lock:
+            self.conversations = []
+            self.index = HistoryIndex()
+        self.log.clear()
@@ -0,0 +1,81 @@
+import threading
+import wave
+
+import numpy as np
+
+def read_wav(path):
+    """Read a 16-bit PCM WAV file (path or file object) into (mono int16 samples, sample rate)"""
+    with wave.open(path if hasattr(path, 'read') else str(path), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("only 16-bit PCM WAV files are supported")
+        channels = wav.getnchannels()
+        sample_rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, sample_rate
+
+def audio_data_samples(audio):
+    """Convert a speech_recognition AudioData to (int16 samples, sample rate)"""
+    return np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16), audio.sample_rate
+
+class VoiceActivityDetector:
+    """Energy and zero-crossing voice activity detector with an adaptive noise floor"""
+
+    def __init__(self, frame_ms=20, energy_ratio=3.0, max_zero_crossing_rate=0.35,
+                 min_speech_ms=120, adapt_rate=0.1, min_floor=50.0):
+        self.frame_ms = frame_ms
+        self.energy_ratio = energy_ratio
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.min_speech_ms = min_speech_ms
+        self.adapt_rate = adapt_rate
+        self.min_floor = min_floor
+        self.noise_floor = None
+        self._lock = threading.Lock()
+
+    def frame_features(self, samples, sample_rate):
+        """Return per-frame RMS energy and zero-crossing rate"""
+        frame_length = max(1, int(sample_rate * self.frame_ms / 1000))
+        frame_count = len(samples) // frame_length
+        if frame_count == 0:
+            return np.zeros(0), np.zeros(0)
+        frames = np.asarray(samples[:frame_count * frame_length], dtype=np.float32)
+        frames = frames.reshape(frame_count, frame_length)
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+        return energy, zero_crossing_rate
+
+    def speech_mask(self, samples, sample_rate):
+        """Flag speech frames and adapt the noise floor from the others"""
+        energy, zero_crossing_rate = self.frame_features(samples, sample_rate)
+        if not energy.size:
+            return np.zeros(0, dtype=bool)
+
+        with self._lock:
+            if self.noise_floor is None:
+                # Seed from the quietest frames instead of a blocking calibration
+                self.noise_floor = max(float(np.percentile(energy, 10)), self.min_floor)
+            floor = self.noise_floor
+            mask = (energy > floor * self.energy_ratio) & (zero_crossing_rate < self.max_zero_crossing_rate)
+
+            noise = energy[~mask]
+            if noise.size:
+                level = float(np.median(noise))
+                # Drop quickly when the room gets quieter, rise slowly otherwise
+                rate = 0.5 if level < floor else self.adapt_rate
+                self.noise_floor = max(floor + rate * (level - floor), self.min_floor)
+        return mask
+
+    def contains_speech(self, samples, sample_rate):
+        """True if the segment holds a long enough run of speech frames"""
+        mask = self.speech_mask(samples, sample_rate)
+        if not mask.any():
+            return False
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        longest_run = int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+        return longest_run * self.frame_ms >= self.min_speech_ms
+
+    def audio_contains_speech(self, audio):
+        """contains_speech for a speech_recognition AudioData segment"""
+        return self.contains_speech(*audio_data_samples(audio))
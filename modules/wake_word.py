@@ -0,0 +1,278 @@
+"""Local wake-word spotting by template matching on MFCC features.
+
+Enroll a few recordings of the wake word, then check WAV files offline:
+    python -m modules.wake_word enroll jarvis hey_jarvis_1.wav hey_jarvis_2.wav
+    python -m modules.wake_word detect jarvis recording.wav
+"""
+
+import argparse
+import functools
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.voice_activity import audio_data_samples, read_wav
+
+DEFAULT_THRESHOLD = 0.9
+CALIBRATION_MARGIN = 1.4
+
+@functools.lru_cache(maxsize=8)
+def mel_filterbank(sample_rate, fft_size, mel_bands=26, low_hz=60.0):
+    """Triangular mel filters as a (mel_bands, fft_size // 2 + 1) matrix"""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(low_hz), to_mel(sample_rate / 2), mel_bands + 2))
+    bins = np.floor((fft_size + 1) * edges / sample_rate).astype(int)
+    filters = np.zeros((mel_bands, fft_size // 2 + 1), dtype=np.float32)
+    for band in range(mel_bands):
+        left, center, right = bins[band], bins[band + 1], max(bins[band + 2], bins[band + 1] + 1)
+        center = max(center, left + 1)
+        filters[band, left:center] = (np.arange(left, center) - left) / (center - left)
+        filters[band, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+@functools.lru_cache(maxsize=8)
+def dct_matrix(bands, coefficients):
+    """Orthonormal DCT-II rows turning log mel energies into cepstra"""
+    n = np.arange(bands)
+    matrix = np.cos(np.pi / bands * (n + 0.5)[None, :] * np.arange(coefficients)[:, None])
+    matrix *= np.sqrt(2.0 / bands)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+def mfcc(samples, sample_rate, frame_ms=25, hop_ms=10, mel_bands=26, coefficients=13):
+    """MFCC-like features, one row per 10 ms hop, without the loudness term c0"""
+    signal = np.asarray(samples, dtype=np.float32)
+    frame_length = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    if len(signal) < frame_length:
+        return np.zeros((0, coefficients - 1), dtype=np.float32)
+
+    signal = np.append(signal[0], signal[1:] - 0.97 * signal[:-1])
+    frames = np.lib.stride_tricks.sliding_window_view(signal, frame_length)[::hop]
+    frames = frames * np.hamming(frame_length).astype(np.float32)
+    fft_size = 1 << (frame_length - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, fft_size)) ** 2 / fft_size
+    energies = np.log(power @ mel_filterbank(sample_rate, fft_size, mel_bands).T + 1e-6)
+    return (energies @ dct_matrix(mel_bands, coefficients).T)[:, 1:]
+
+def trim_silence(samples, sample_rate, frame_ms=10, ratio=0.1, noise_ratio=3.0):
+    """Cut leading and trailing frames that are near the noise floor or far below the peak"""
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return samples
+    frames = np.asarray(samples[:frame_count * frame_length], dtype=np.float32).reshape(frame_count, frame_length)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    threshold = max(energy.max() * ratio, np.percentile(energy, 10) * noise_ratio)
+    loud = np.flatnonzero(energy >= threshold)
+    return samples[loud[0] * frame_length:(loud[-1] + 1) * frame_length]
+
+def subsequence_dtw(template, features):
+    """Best alignment of template anywhere in features; (mean frame distance, end frame)
+
+    Steps (1,1), (1,2) and (2,1) keep the warp between half and double speed
+    and only look back one or two template rows, so each row is one NumPy
+    operation over the whole input.
+    """
+    n, m = len(template), len(features)
+    if n == 0 or m < n // 2:
+        return np.inf, -1
+    scale = np.sqrt(template.shape[1])
+    cost = np.sqrt(((template[:, None, :] - features[None, :, :]) ** 2).sum(axis=2)) / scale
+
+    previous2 = None
+    previous = cost[0].copy()
+    for i in range(1, n):
+        best = np.full(m, np.inf)
+        best[1:] = previous[:-1]
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        if previous2 is not None:
+            # Skipping template row i-1 still pays its cost, so every row counts once
+            best[1:] = np.minimum(best[1:], previous2[:-1] + cost[i - 1, 1:])
+        previous2, previous = previous, cost[i] + best
+    end = int(np.argmin(previous))
+    return float(previous[end] / n), end
+
+class WakeWordSpotter:
+    """Keyword spotter matching enrolled wake-word templates with subsequence DTW"""
+
+    def __init__(self, wake_word="jarvis", threshold=None, template_dir="data/wake_words",
+                 max_templates=10, hop_ms=10):
+        self.wake_word = wake_word
+        self.template_dir = Path(template_dir)
+        self.max_templates = max_templates
+        self.hop_ms = hop_ms
+        self.templates = []
+        self.threshold = threshold
+        self._fixed_threshold = threshold is not None
+        self.stats = {"checks": 0, "detections": 0, "audio_seconds": 0.0, "cpu_seconds": 0.0}
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def configured(self):
+        return bool(self.templates)
+
+    @property
+    def template_path(self):
+        return self.template_dir / f"{self.wake_word}.npz"
+
+    def _features(self, samples, sample_rate):
+        # Without c0 the features ignore loudness. Mean normalization is left
+        # out: over a whole segment it is skewed by the words around the match
+        return mfcc(samples, sample_rate, hop_ms=self.hop_ms)
+
+    def enroll(self, samples, sample_rate):
+        """Add one recording of the wake word spoken on its own"""
+        features = self._features(trim_silence(samples, sample_rate), sample_rate)
+        if len(features) < 10:
+            raise ValueError("recording is too short to use as a wake-word template")
+        with self._lock:
+            self.templates.append(features)
+            del self.templates[:-self.max_templates]
+        self.calibrate()
+
+    def enroll_wav(self, path):
+        self.enroll(*read_wav(path))
+
+    def calibrate(self):
+        """Set the threshold just above how far enrolled templates are from each other"""
+        if self._fixed_threshold:
+            return self.threshold
+        with self._lock:
+            templates = list(self.templates)
+        scores = []
+        for i, template in enumerate(templates):
+            for j, other in enumerate(templates):
+                if i != j:
+                    scores.append(subsequence_dtw(template, other)[0])
+        finite = [score for score in scores if np.isfinite(score)]
+        self.threshold = max(finite) * CALIBRATION_MARGIN if finite else DEFAULT_THRESHOLD
+        return self.threshold
+
+    def score(self, samples, sample_rate):
+        """Best (distance, end in seconds) of any template within the samples"""
+        started = time.process_time()
+        features = self._features(samples, sample_rate)
+        best, best_end = np.inf, -1
+        with self._lock:
+            templates = list(self.templates)
+        for template in templates:
+            distance, end = subsequence_dtw(template, features)
+            if distance < best:
+                best, best_end = distance, end
+        with self._lock:
+            self.stats["checks"] += 1
+            self.stats["audio_seconds"] += len(samples) / sample_rate
+            self.stats["cpu_seconds"] += time.process_time() - started
+        # A feature row covers [row * hop, row * hop + frame); the match ends with its frame
+        end_seconds = (best_end * self.hop_ms + 25) / 1000 if best_end >= 0 else None
+        return best, end_seconds
+
+    def detect(self, samples, sample_rate):
+        """(True, end of the wake word in seconds) if the wake word was spoken"""
+        if not self.templates:
+            return False, None
+        distance, end_seconds = self.score(samples, sample_rate)
+        detected = distance <= self.threshold
+        if detected:
+            with self._lock:
+                self.stats["detections"] += 1
+        return detected, end_seconds if detected else None
+
+    def detect_audio(self, audio):
+        """detect for a speech_recognition AudioData segment"""
+        return self.detect(*audio_data_samples(audio))
+
+    def detect_wav(self, path):
+        return self.detect(*read_wav(path))
+
+    def real_time_factor(self):
+        """CPU seconds spent spotting per second of audio checked"""
+        with self._lock:
+            audio_seconds = self.stats["audio_seconds"]
+            return self.stats["cpu_seconds"] / audio_seconds if audio_seconds else 0.0
+
+    def save(self):
+        """Store the templates under template_dir/<wake word>.npz"""
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            arrays = {f"template_{i}": template for i, template in enumerate(self.templates)}
+        np.savez(self.template_path, **arrays)
+
+    def load(self):
+        """Load saved templates for the wake word, if any"""
+        if not self.template_path.exists():
+            return False
+        with np.load(self.template_path) as data:
+            templates = [data[name] for name in sorted(data.files, key=lambda name: int(name.split("_")[1]))]
+        with self._lock:
+            self.templates = templates
+        self.calibrate()
+        return True
+
+class WakeWordGate:
+    """Wake-word state of one listener: lets through only the command that goes with the wake word
+
+    check() returns (status, offset). "command" means the wake word and the
+    command came in one breath; the command starts at offset seconds.
+    "awake" means only the wake word was heard, so the next utterance within
+    timeout is passed on whole as "follow_up". Anything else is "rejected".
+    """
+
+    def __init__(self, spotter, timeout=8.0, min_command_seconds=0.3):
+        self.spotter = spotter
+        self.timeout = timeout
+        self.min_command_seconds = min_command_seconds
+        self.awake_until = 0.0
+
+    def check(self, samples, sample_rate, now, has_speech=None):
+        """Gate one utterance captured at now (monotonic seconds)"""
+        if now < self.awake_until:
+            # The utterance right after the wake word is the command; then sleep again
+            self.awake_until = 0.0
+            return "follow_up", 0.0
+        detected, end_seconds = self.spotter.detect(samples, sample_rate)
+        if not detected:
+            return "rejected", None
+        remainder = samples[int(end_seconds * sample_rate):]
+        if (len(remainder) >= self.min_command_seconds * sample_rate
+                and (has_speech is None or has_speech(remainder, sample_rate))):
+            return "command", end_seconds
+        self.awake_until = now + self.timeout
+        return "awake", None
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll or test wake-word templates on WAV files")
+    parser.add_argument("action", choices=["enroll", "detect"])
+    parser.add_argument("wake_word")
+    parser.add_argument("wav_files", nargs="+")
+    parser.add_argument("--template-dir", default="data/wake_words")
+    args = parser.parse_args()
+
+    spotter = WakeWordSpotter(args.wake_word, template_dir=args.template_dir)
+    if args.action == "enroll":
+        for path in args.wav_files:
+            spotter.enroll_wav(path)
+        spotter.save()
+        print(f"{len(spotter.templates)} template(s) saved to {spotter.template_path}, "
+              f"threshold {spotter.threshold:.3f}")
+        return
+    if not spotter.configured:
+        parser.error(f"no templates enrolled for '{args.wake_word}'")
+    for path in args.wav_files:
+        samples, sample_rate = read_wav(path)
+        distance, end_seconds = spotter.score(samples, sample_rate)
+        verdict = "wake word" if distance <= spotter.threshold else "no wake word"
+        where = f" ending at {end_seconds:.2f}s" if distance <= spotter.threshold else ""
+        print(f"{path}: {verdict} (distance {distance:.3f}, threshold {spotter.threshold:.3f}){where}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,22 @@
-
 import streamlit as st
-import speech_recognition as sr
-import pyttsx3
-import threading
-import queue
 import time
-import json
-import os
-import datetime
-import requests
-import random
+import uuid
+import html
+import functools
 from pathlib import Path
+from modules.jarvis_ai import JarvisAI
+from modules.utils import ConversationManager, format_timestamp, load_config, get_default_config, setup_logging
+from modules.config_service import get_config_service, thaw
+from modules.message_store import MessageStore, Role, remove_stale_spills
+from modules.telemetry import get_telemetry
+from modules.log_pipeline import get_log_pipeline, log_context
+from modules.job_scheduler import get_job_scheduler
+
+# Messages kept in RAM per browser session; older ones spill to disk
+SESSION_HISTORY_LIMIT = 200
+
+# Messages shown per chat page
+CHAT_PAGE_SIZE = 20
 
 # Page configuration
 st.set_page_config(
@@ -22,25 +28,29 @@ st.set_page_config(
 
 # Initialize session state
 def initialize_session_state():
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if 'conversation_history' not in st.session_state:
-        st.session_state.conversation_history = []
+        st.session_state.conversation_history = MessageStore(
+            capacity=SESSION_HISTORY_LIMIT,
+            spill_path=f"data/sessions/{st.session_state.session_id}.jsonl"
+        )
     if 'is_listening' not in st.session_state:
         st.session_state.is_listening = False
     if 'start_time' not in st.session_state:
         st.session_state.start_time = time.time()
+    if 'chat_page' not in st.session_state:
+        st.session_state.chat_page = 0
     if 'commands_count' not in st.session_state:
         st.session_state.commands_count = 0
-    if 'user_preferences' not in st.session_state:
-        st.session_state.user_preferences = load_user_preferences()
+    # Snapshots come from the shared config cache, so this picks up hot reloads for free
+    st.session_state.user_preferences = load_user_preferences()
 
 def load_user_preferences():
-    """Load user preferences from config file"""
-    try:
-        if os.path.exists('config/user_preferences.json'):
-            with open('config/user_preferences.json', 'r') as f:
-                return json.load(f)
-    except:
-        pass
+    """Load user preferences from the shared config cache"""
+    preferences = get_config_service().get('config/user_preferences.json')
+    if preferences is not None:
+        return preferences
     return {
         "voice_enabled": True,
         "wake_word": "jarvis",
@@ -49,10 +59,8 @@ def load_user_preferences():
     }
 
 def save_user_preferences(preferences):
-    """Save user preferences to config file"""
-    os.makedirs('config', exist_ok=True)
-    with open('config/user_preferences.json', 'w') as f:
-        json.dump(preferences, f, indent=4)
+    """Save user preferences to config file atomically"""
+    return get_config_service().save('config/user_preferences.json', preferences)
 
 # Custom CSS for JARVIS theme
 def load_css():
@@ -109,156 +117,161 @@ def load_css():
     </style>
     """, unsafe_allow_html=True)
 
-class JarvisAI:
-    def __init__(self):
-        self.context_memory = []
-        self.commands_db = self.load_commands_database()
-    
-    def load_commands_database(self):
-        """Load command patterns and responses"""
-        return {
-            "greetings": ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"],
-            "time_queries": ["time", "what time", "current time"],
-            "date_queries": ["date", "what date", "today", "current date"],
-            "weather_queries": ["weather", "temperature", "forecast"],
-            "system_commands": ["open", "close", "launch", "start", "shutdown", "restart"],
-            "calculations": ["calculate", "compute", "math", "+", "-", "*", "/"],
-            "jokes": ["joke", "funny", "humor", "laugh"],
-            "goodbye": ["bye", "goodbye", "see you", "exit", "quit"]
-        }
-    
-    def process_command(self, command):
-        """Main command processing function"""
-        command_lower = command.lower().strip()
-        
-        # Update context memory
-        self.context_memory.append(command_lower)
-        if len(self.context_memory) > 10:
-            self.context_memory.pop(0)
-        
-        # Classify and handle command
-        intent = self.classify_intent(command_lower)
-        
-        if intent == "greeting":
-            return self.handle_greeting()
-        elif intent == "time":
-            return self.handle_time_query()
-        elif intent == "date":
-            return self.handle_date_query()
-        elif intent == "weather":
-            return self.handle_weather_query(command_lower)
-        elif intent == "system":
-            return self.handle_system_command(command_lower)
-        elif intent == "calculation":
-            return self.handle_calculation(command_lower)
-        elif intent == "joke":
-            return self.handle_joke_request()
-        elif intent == "goodbye":
-            return self.handle_goodbye()
-        else:
-            return self.handle_unknown_command(command)
-    
-    def classify_intent(self, command):
-        """Classify user intent based on command"""
-        for intent, keywords in self.commands_db.items():
-            if any(keyword in command for keyword in keywords):
-                return intent.replace("_queries", "").replace("_commands", "").replace("s", "")
-        return "unknown"
-    
-    def handle_greeting(self):
-        greetings = [
-            "Hello! I'm JARVIS, your AI assistant. How can I help you today?",
-            "Greetings! JARVIS at your service. What can I do for you?",
-            "Hi there! Ready to assist you with anything you need.",
-            "Good day! JARVIS here, ready for your commands."
-        ]
-        return random.choice(greetings)
+@functools.lru_cache(maxsize=4096)
+def render_message_html(role, content):
+    """Pre-render one chat message; repeated messages reuse the cached HTML"""
+    if role is Role.USER:
+        return f'<div class="chat-message-user"><strong>👤 You:</strong> {html.escape(content)}</div>'
+    return f'<div class="chat-message-ai"><strong>🤖 JARVIS:</strong> {html.escape(content)}</div>'
+
+@st.fragment
+def render_chat(jarvis):
+    """Chat pane; its widgets rerun only this fragment, not the whole page"""
+    history = st.session_state.conversation_history
     
-    def handle_time_query(self):
-        current_time = datetime.datetime.now().strftime("%I:%M %p")
-        return f"The current time is {current_time}"
+    # Chat history: one page of memoized HTML in a single element
+    if history:
+        messages = history.page(st.session_state.chat_page * CHAT_PAGE_SIZE, CHAT_PAGE_SIZE)
+        st.markdown(
+            "".join(render_message_html(message.role, message.content) for message in messages),
+            unsafe_allow_html=True
+        )
+        page_count = (len(history) + CHAT_PAGE_SIZE - 1) // CHAT_PAGE_SIZE
+        if page_count > 1:
+            col_older, col_page, col_newer = st.columns([1, 2, 1])
+            col_older.button(
+                "⬆️ Older", key="chat_older", use_container_width=True,
+                disabled=st.session_state.chat_page >= page_count - 1,
+                on_click=change_chat_page, args=(1,)
+            )
+            col_page.caption(f"Page {page_count - st.session_state.chat_page} of {page_count}")
+            col_newer.button(
+                "⬇️ Newer", key="chat_newer", use_container_width=True,
+                disabled=st.session_state.chat_page == 0,
+                on_click=change_chat_page, args=(-1,)
+            )
+    else:
+        st.info("👋 Hello! I'm JARVIS. Type a message or use voice commands to get started!")
     
-    def handle_date_query(self):
-        current_date = datetime.datetime.now().strftime("%B %d, %Y")
-        day_of_week = datetime.datetime.now().strftime("%A")
-        return f"Today is {day_of_week}, {current_date}"
+    # Input section
+    st.subheader("📝 Command Input")
     
-    def handle_weather_query(self, command):
-        # For demo purposes - you'd integrate with a real weather API
-        cities = ["New York", "London", "Tokyo", "Paris", "Sydney"]
-        weather_conditions = ["sunny", "cloudy", "rainy", "partly cloudy", "clear"]
-        temperature = random.randint(15, 30)
-        condition = random.choice(weather_conditions)
-        
-        return f"I'd need access to a weather API for real data, but here's a demo: It's {temperature}°C and {condition} outside. For real weather data, please integrate with OpenWeatherMap API."
+    # Text input
+    st.text_input(
+        "Enter your command:", 
+        placeholder="Ask me anything...",
+        key="text_input"
+    )
     
-    def handle_system_command(self, command):
-        if "open" in command:
-            if "calculator" in command:
-                return "Calculator would be opened (system integration needed for actual execution)"
-            elif "notepad" in command:
-                return "Notepad would be opened (system integration needed for actual execution)"
-            elif "browser" in command or "chrome" in command:
-                return "Browser would be opened (system integration needed for actual execution)"
-            else:
-                return "System command recognized but specific application not identified"
-        elif "shutdown" in command:
-            return "Shutdown command received (would require elevated permissions in actual implementation)"
-        else:
-            return "System command recognized but not implemented in this demo version"
+    col_send, col_clear = st.columns([1, 1])
     
-    def handle_calculation(self, command):
-        try:
-            # Simple calculation parser
-            import re
-            # Extract numbers and operators
-            expression = re.findall(r'[\d+\-*/().]+', command)
-            if expression:
-                calc_string = ''.join(expression)
-                # Basic safety check
-                if all(c in '0123456789+-*/(). ' for c in calc_string):
-                    result = eval(calc_string)
-                    return f"The result is: {result}"
-            return "I can help with calculations, but I need a clearer mathematical expression. Try something like '2 + 2' or 'calculate 10 * 5'"
-        except:
-            return "I couldn't process that calculation. Please try a simpler format like '2 + 2'"
+    with col_send:
+        st.button(
+            "📤 Send Command", use_container_width=True,
+            on_click=submit_text_command, args=(jarvis,)
+        )
     
-    def handle_joke_request(self):
-        jokes = [
-            "Why don't scientists trust atoms? Because they make up everything!",
-            "Why did the AI go to therapy? It had too many deep learning issues!",
-            "What do you call a computer that sings? A-Dell!",
-            "Why don't robots ever panic? They have great artificial composure!",
-            "What's an AI's favorite type of music? Algo-rhythms!"
-        ]
-        return random.choice(jokes)
+    with col_clear:
+        st.button(
+            "🗑️ Clear History", use_container_width=True,
+            on_click=clear_chat_history, args=(jarvis,)
+        )
+
+def render_system_jobs(scheduler, session_id):
+    """This session's job table; refreshes itself every few seconds while one of its jobs is active"""
+    active = scheduler.active_count(session_id) > 0
     
-    def handle_goodbye(self):
-        farewells = [
-            "Goodbye! Feel free to call on me anytime you need assistance.",
-            "See you later! I'll be here whenever you need help.",
-            "Until next time! Stay safe and productive.",
-            "Farewell! It was a pleasure assisting you today."
-        ]
-        return random.choice(farewells)
+    @st.fragment(run_every=2 if active else None)
+    def job_table():
+        if active and scheduler.active_count(session_id) == 0:
+            # Everything finished: one full rerun drops the refresh timer
+            st.rerun()
+        jobs = scheduler.jobs(session_id, limit=10)
+        if not jobs:
+            st.caption("No system jobs yet. Try 'Open calculator'.")
+            return
+        st.dataframe(jobs, hide_index=True, use_container_width=True)
+        st.caption(" · ".join(f"{name}: {value}" for name, value in sorted(scheduler.summary().items())))
     
-    def handle_unknown_command(self, command):
-        responses = [
-            f"I'm not sure I understand '{command}'. Could you rephrase that?",
-            "That's an interesting request! I'm still learning. Can you try asking differently?",
-            "I don't have that capability yet, but I'm always improving. What else can I help with?",
-            "Could you clarify what you'd like me to do? I'm here to help!"
-        ]
-        return random.choice(responses)
+    job_table()
 
 # Initialize JARVIS
 @st.cache_resource
 def get_jarvis():
+    # Real launches only when the server owner turned them on; otherwise demo replies
+    if system_actions_enabled():
+        return JarvisAI(job_scheduler=get_system_jobs())
     return JarvisAI()
 
+def system_actions_enabled():
+    return load_config().get("system", {}).get("execute_actions", get_default_config()["system"]["execute_actions"])
+
+@st.cache_resource
+def get_system_jobs():
+    """Scheduler running system actions in the background for every session"""
+    settings = {**get_default_config()["system"], **load_config().get("system", {})}
+    return get_job_scheduler(
+        workers=settings["job_workers"],
+        timeout=settings["job_timeout"],
+        dedupe_window=settings["job_dedupe_window"],
+        action_limits=settings["job_action_limits"]
+    )
+
+@st.cache_resource
+def get_system_controller():
+    # psutil, NumPy and the sampler thread load only once the monitor is opened
+    # or the first system job runs; the scheduler and monitor share one controller
+    return get_system_jobs().get_controller()
+
+@st.cache_resource
+def get_logger():
+    return setup_logging(load_config().get("logging"))
+
+@st.cache_resource
+def get_diagnostics():
+    """Configure the shared telemetry registry and its Prometheus file export"""
+    settings = {**get_default_config()["diagnostics"], **load_config().get("diagnostics", {})}
+    telemetry = get_telemetry()
+    telemetry.enabled = settings["metrics_enabled"]
+    telemetry.slow_threshold = settings["slow_threshold"]
+    if settings["prometheus_file"]:
+        telemetry.start_file_export(settings["prometheus_file"], settings["export_interval"])
+    return telemetry
+
+@st.cache_resource
+def get_speech_service():
+    """Speech worker pool shared by every session; started on first voice activation"""
+    from modules.speech_service import SpeechService
+    settings = {**get_default_config()["voice"], **load_config().get("voice", {})}
+    # Each session's wake word goes with its recordings, so one pool serves all of them
+    return SpeechService(
+        workers=settings["service_workers"],
+        slots=settings["service_slots"],
+        recognizer=settings["recognizer"],
+        wake_word=settings["wake_word"]
+    )
+
+@st.cache_resource
+def clean_session_spills():
+    """Once per process: drop spill files that sessions of an earlier run left behind"""
+    return remove_stale_spills("data/sessions", time.time())
+
+@st.cache_resource
+def get_conversation_manager():
+    """Searchable history shared by the process: a small recent tail, a deep search index"""
+    defaults = get_default_config()
+    config = load_config()
+    ui_settings = {**defaults["ui"], **config.get("ui", {})}
+    settings = {**defaults["history"], **config.get("history", {})}
+    return ConversationManager(max_history=ui_settings["max_history"],
+                               max_indexed=settings["max_records"])
+
 def main():
+    clean_session_spills()
     initialize_session_state()
     load_css()
+    get_logger()
+    telemetry = get_diagnostics()
     jarvis = get_jarvis()
     
     # Header
@@ -319,14 +332,15 @@ def main():
         
         # Save settings
         if st.button("💾 Save Settings"):
+            # Keep keys the sidebar does not edit, e.g. voice_settings
             new_preferences = {
+                **thaw(st.session_state.user_preferences),
                 "voice_enabled": voice_enabled,
                 "wake_word": wake_word,
                 "confidence_threshold": confidence_threshold,
                 "response_speed": response_speed
             }
-            st.session_state.user_preferences = new_preferences
-            save_user_preferences(new_preferences)
+            st.session_state.user_preferences = save_user_preferences(new_preferences)
             st.success("Settings saved!")
         
         # System Stats
@@ -334,56 +348,60 @@ def main():
         session_time = int(time.time() - st.session_state.start_time)
         st.metric("Session Duration", f"{session_time//60}m {session_time%60}s")
         st.metric("Commands Processed", st.session_state.commands_count)
-        st.metric("Conversations", len(st.session_state.conversation_history)//2)
+        st.metric("Conversations", st.session_state.conversation_history.total_count//2)
+        st.metric("Session Memory", f"{st.session_state.conversation_history.memory_usage() / 1024:.1f} KB")
+        
+        # Diagnostics
+        with st.expander("🩺 Diagnostics"):
+            telemetry.enabled = st.toggle("Collect latency metrics", value=telemetry.enabled)
+            rows = telemetry.summary()
+            if rows:
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+                counters = telemetry.counters()
+                if counters:
+                    st.json(counters)
+                st.download_button(
+                    "⬇️ Prometheus metrics",
+                    telemetry.render_prometheus(),
+                    file_name="jarvis_metrics.prom",
+                    mime="text/plain"
+                )
+            else:
+                st.caption("No samples yet")
+            pipeline = get_log_pipeline()
+            if pipeline is not None:
+                st.caption("Logging pipeline")
+                st.json(pipeline.stats())
+            if st.session_state.is_listening:
+                st.caption("Speech workers")
+                service = get_speech_service()
+                st.dataframe(service.health(), hide_index=True, use_container_width=True)
     
     # Main content
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.subheader("💬 Chat Interface")
+        render_chat(jarvis)
         
-        # Chat history container
-        chat_container = st.container()
-        
-        with chat_container:
-            if st.session_state.conversation_history:
-                for i, message in enumerate(st.session_state.conversation_history[-20:]):  # Show last 20 messages
-                    if message['type'] == 'user':
-                        st.markdown(f"""
-                        <div class="chat-message-user">
-                            <strong>👤 You:</strong> {message['content']}
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"""
-                        <div class="chat-message-ai">
-                            <strong>🤖 JARVIS:</strong> {message['content']}
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.info("👋 Hello! I'm JARVIS. Type a message or use voice commands to get started!")
-        
-        # Input section
-        st.subheader("📝 Command Input")
-        
-        # Text input
-        user_input = st.text_input(
-            "Enter your command:", 
-            placeholder="Ask me anything...",
-            key="text_input"
-        )
-        
-        col_send, col_clear = st.columns([1, 1])
-        
-        with col_send:
-            if st.button("📤 Send Command", use_container_width=True) and user_input:
-                process_user_command(jarvis, user_input)
-        
-        with col_clear:
-            if st.button("🗑️ Clear History", use_container_width=True):
-                st.session_state.conversation_history = []
-                st.session_state.commands_count = 0
-                st.rerun()
+        # History search
+        with st.expander("🔎 Search History"):
+            search_query = st.text_input(
+                "Search past conversations:",
+                placeholder="e.g. weather last week",
+                key="history_search"
+            )
+            if search_query:
+                manager = get_conversation_manager()
+                results = manager.query_history(search_query)
+                if results:
+                    for result in results:
+                        st.markdown(
+                            f"**{format_timestamp(result['timestamp'])}** 👤 {result['user_input']}  \n"
+                            f"🤖 {result['ai_response']}"
+                        )
+                else:
+                    st.info("No matching conversations found")
     
     with col2:
         st.subheader("⚡ Quick Commands")
@@ -415,14 +433,68 @@ def main():
         for category, commands in command_categories.items():
             with st.expander(category):
                 for cmd in commands:
-                    if st.button(cmd, key=f"quick_{cmd}", use_container_width=True):
-                        process_user_command(jarvis, cmd)
+                    st.button(
+                        cmd, key=f"quick_{cmd}", use_container_width=True,
+                        on_click=process_user_command, args=(jarvis, cmd)
+                    )
+        
+        # System monitor
+        with st.expander("📈 System Monitor"):
+            # Expander bodies run even when collapsed, so keep psutil/plotly off first paint
+            if st.toggle("Show live metrics", key="monitor_enabled"):
+                metric_labels = {
+                    "CPU %": "cpu_percent",
+                    "Memory %": "memory_percent",
+                    "Disk %": "disk_percent",
+                    "Network sent (B/s)": "net_sent_rate",
+                    "Network received (B/s)": "net_recv_rate"
+                }
+                window_options = {
+                    "Last minute": 60,
+                    "Last hour": 3600,
+                    "Last day": 86400,
+                    "Last 30 days": 30 * 86400
+                }
+                metric_label = st.selectbox("Metric", list(metric_labels), key="monitor_metric")
+                window_label = st.selectbox("Window", list(window_options), index=1, key="monitor_window")
+                field = metric_labels[metric_label]
+                seconds = window_options[window_label]
+                
+                history = get_system_controller().metrics_history
+                stats = history.stats(field, seconds)
+                if stats:
+                    stat_cols = st.columns(4)
+                    for stat_col, name in zip(stat_cols, ["min", "mean", "p95", "max"]):
+                        stat_col.metric(name, f"{stats[name]:.1f}")
+                    st.plotly_chart(history.figure(field, seconds), use_container_width=True)
+                else:
+                    st.info("Collecting samples...")
+        
+        # Background system jobs
+        with st.expander("🗂️ System Jobs"):
+            if system_actions_enabled():
+                render_system_jobs(get_system_jobs(), st.session_state.session_id)
+            else:
+                st.caption("System commands run in demo mode. Set system.execute_actions in the config to launch applications.")
         
         # Voice status
         st.subheader("🔊 Audio Status")
         if st.session_state.is_listening:
             st.success("🎤 Ready for voice input")
-            st.info("💡 Say 'Hey JARVIS' followed by your command")
+            wake_word = st.session_state.user_preferences.get("wake_word", "jarvis")
+            st.info(f"💡 Say 'Hey {wake_word.upper()}' followed by your command")
+            if not Path(f"data/wake_words/{wake_word}.npz").exists():
+                st.caption(
+                    f"No '{wake_word}' templates enrolled, so every utterance is recognized. "
+                    f"Enroll with: python -m modules.wake_word enroll {wake_word} <wav files>"
+                )
+            st.audio_input(
+                "Record a command", key="voice_recording",
+                on_change=submit_voice_command, args=(jarvis,)
+            )
+            voice_status = st.session_state.get("voice_status")
+            if voice_status:
+                st.caption(voice_status)
         else:
             st.warning("🔇 Voice input inactive")
         
@@ -444,27 +516,72 @@ def process_user_command(jarvis, command):
     """Process user command and update conversation history"""
     if command.strip():
         # Add user message
-        st.session_state.conversation_history.append({
-            'type': 'user',
-            'content': command,
-            'timestamp': datetime.datetime.now().isoformat()
-        })
+        st.session_state.conversation_history.append(Role.USER, command)
         
-        # Process with JARVIS
-        response = jarvis.process_command(command)
+        # Process with JARVIS; log records carry the session id
+        context = jarvis.session_context(st.session_state.session_id)
+        with log_context(session_id=st.session_state.session_id):
+            response = jarvis.process_command(command, context)
         
         # Add AI response
-        st.session_state.conversation_history.append({
-            'type': 'ai',
-            'content': response,
-            'timestamp': datetime.datetime.now().isoformat()
-        })
+        st.session_state.conversation_history.append(Role.AI, response)
         
-        # Update counters
-        st.session_state.commands_count += 1
+        # Persist to searchable history
+        if st.session_state.user_preferences.get("auto_save_conversations", True):
+            manager = get_conversation_manager()
+            manager.add_conversation(command, response, session_id=st.session_state.session_id)
         
-        # Auto-scroll and refresh
-        st.rerun()
+        # Update counters and jump back to the newest page
+        st.session_state.commands_count += 1
+        st.session_state.chat_page = 0
+
+def submit_text_command(jarvis):
+    """Send button callback: process the typed command and clear the input"""
+    process_user_command(jarvis, st.session_state.text_input)
+    st.session_state.text_input = ""
+
+VOICE_STATUS_MESSAGES = {
+    "no_speech": "No speech detected in the recording",
+    "no_wake_word": "Wake word not heard; start with it, then give your command",
+    "awake": "Listening... record your command",
+    "unrecognized": "Sorry, I couldn't make that out",
+    "error": "Speech recognition failed"
+}
+
+def submit_voice_command(jarvis):
+    """Recorder callback: transcribe on the shared speech workers, then process the text"""
+    recording = st.session_state.voice_recording
+    if recording is None:
+        return
+    service = get_speech_service()
+    st.session_state.speech_service_used = True
+    try:
+        result = service.transcribe_wav(
+            st.session_state.session_id, recording,
+            wake_word=st.session_state.user_preferences.get("wake_word", "jarvis")
+        )
+    except Exception as e:
+        get_logger().error("Voice command failed: %s", e, extra={"session_id": st.session_state.session_id})
+        st.session_state.voice_status = f"Speech service unavailable: {e}"
+        return
+    if result["status"] == "ok":
+        st.session_state.voice_status = f"Heard: {result['text']} ({result['latency_ms']:.0f} ms)"
+        process_user_command(jarvis, result["text"])
+    else:
+        st.session_state.voice_status = VOICE_STATUS_MESSAGES[result["status"]]
+
+def clear_chat_history(jarvis):
+    """Clear History button callback"""
+    st.session_state.conversation_history.clear()
+    st.session_state.commands_count = 0
+    st.session_state.chat_page = 0
+    jarvis.sessions.discard(st.session_state.session_id)
+    if st.session_state.get("speech_service_used"):
+        get_speech_service().discard_session(st.session_state.session_id)
+
+def change_chat_page(step):
+    """Pagination callback: move step pages towards older messages"""
+    st.session_state.chat_page = max(st.session_state.chat_page + step, 0)
 
 # Voice recognition placeholder (for future implementation)
 def start_voice_recognition():
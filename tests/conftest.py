@@ -0,0 +1,12 @@
+from pathlib import Path
+
+import pytest
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+@pytest.fixture
+def fixture_wav():
+    """Path of a WAV fixture by name; regenerate them with tests/fixtures/generate.py"""
+    def path(name):
+        return FIXTURE_DIR / name
+    return path
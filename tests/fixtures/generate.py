@@ -0,0 +1,87 @@
+"""Regenerate the synthetic WAV fixtures used by the speech tests.
+
+The clips are vowel-formant "words" rather than recorded speech, so they
+are small, deterministic and free to commit. Run from the project root:
+    python tests/fixtures/generate.py
+"""
+
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FIXTURE_DIR = Path(__file__).parent
+
+# First two formants (Hz) of each vowel
+VOWELS = {"a": (800, 1200), "i": (300, 2300), "u": (320, 800), "e": (500, 1900), "o": (500, 900)}
+
+WAKE_WORD = "aio"
+COMMAND = "eue"
+OTHER_WORDS = ("uau", "eie")
+
+def syllable(vowel, seconds, pitch, rng):
+    """A voiced vowel: pitch harmonics shaped by the vowel's formants"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    first, second = VOWELS[vowel]
+    signal = np.zeros_like(t)
+    for harmonic in range(1, 40):
+        frequency = pitch * harmonic
+        if frequency > SAMPLE_RATE / 2 - 500:
+            break
+        weight = (np.exp(-((frequency - first) / 150) ** 2)
+                  + 0.6 * np.exp(-((frequency - second) / 200) ** 2) + 0.02)
+        signal += weight * np.sin(2 * np.pi * frequency * t + rng.uniform(0, 6))
+    envelope = np.minimum(1, np.minimum(t / 0.02, (seconds - t) / 0.03))
+    return signal * envelope
+
+def word(vowels, rng, stretch=1.0):
+    return np.concatenate([
+        syllable(vowel, rng.uniform(0.13, 0.17) * stretch, rng.uniform(110, 130), rng) for vowel in vowels
+    ])
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE))
+
+def clip(parts, rng, noise=0.02):
+    """Join parts, normalize to half scale and add background noise"""
+    signal = np.concatenate(parts)
+    peak = np.abs(signal).max()
+    if peak:
+        signal = signal / peak * 0.5
+    signal = signal + rng.normal(0, noise, len(signal))
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+def write_wav(path, samples):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+
+def fixtures(rng):
+    """File name -> samples for every fixture"""
+    clips = {}
+    for i in range(1, 4):
+        clips[f"wake_word_{i}.wav"] = clip([silence(0.2), word(WAKE_WORD, rng), silence(0.2)], rng)
+    clips["wake_word_then_command.wav"] = clip(
+        [silence(0.3), word(WAKE_WORD, rng), silence(0.15), word(COMMAND, rng, 2), silence(0.3)], rng
+    )
+    clips["command.wav"] = clip([silence(0.3), word(COMMAND, rng, 2), silence(0.3)], rng)
+    for i, other in enumerate(OTHER_WORDS, 1):
+        clips[f"other_word_{i}.wav"] = clip([silence(0.3), word(other, rng, 1.5), silence(0.3)], rng)
+    clips["silence.wav"] = clip([silence(1.0)], rng)
+    # Two utterances separated by a pause longer than the endpointer's 800 ms
+    clips["two_utterances.wav"] = clip([
+        silence(0.6), word(COMMAND, rng, 2), silence(1.2), word(OTHER_WORDS[0], rng, 2), silence(0.8)
+    ], rng)
+    return clips
+
+def main():
+    rng = np.random.default_rng(2024)
+    for name, samples in fixtures(rng).items():
+        write_wav(FIXTURE_DIR / name, samples)
+        print(f"{name}: {len(samples) / SAMPLE_RATE:.2f}s")
+
+if __name__ == "__main__":
+    main()
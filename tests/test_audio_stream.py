@@ -0,0 +1,118 @@
+"""Ring buffer, endpointing and the persistent capture stream"""
+
+import time
+
+import numpy as np
+import pytest
+
+from modules.audio_stream import AudioRingBuffer, AudioSegment, AudioStream, Endpointer, WavFileSource
+from modules.recognizers import ScriptedRecognizer
+from modules.speech_handler import SpeechHandler
+from modules.voice_activity import read_wav
+
+# Where the speech in two_utterances.wav lies, in seconds, allowing for pre-roll and tail
+UTTERANCES = [(0.3, 0.6, 1.5, 1.8), (2.4, 2.7, 3.6, 3.9)]
+
+def ramp(start, count):
+    return np.arange(start, start + count, dtype=np.int16)
+
+def test_ring_buffer_wraps_at_capacity():
+    buffer = AudioRingBuffer(10, 16000)
+    buffer.write(ramp(0, 7))
+    buffer.write(ramp(7, 6))
+    assert buffer.written == 13
+    assert buffer.oldest == 3
+    # The window straddling the wrap point is still one contiguous view
+    view = buffer.view(3, 13)
+    assert np.array_equal(view, ramp(3, 10))
+    assert view.base is not None
+
+def test_ring_buffer_keeps_the_tail_of_an_oversized_write():
+    buffer = AudioRingBuffer(10, 16000)
+    buffer.write(ramp(0, 25).tobytes())
+    assert buffer.oldest == 15
+    assert np.array_equal(buffer.view(15, 25), ramp(15, 10))
+
+@pytest.mark.parametrize("start, end", [(2, 8), (12, 14), (9, 5)])
+def test_ring_buffer_rejects_stale_or_future_reads(start, end):
+    buffer = AudioRingBuffer(10, 16000)
+    buffer.write(ramp(0, 13))
+    with pytest.raises(IndexError):
+        buffer.view(start, end)
+
+def test_segment_is_invalid_once_overwritten():
+    buffer = AudioRingBuffer(10, 16000)
+    buffer.write(ramp(0, 8))
+    segment = AudioSegment(buffer, 2, 8)
+    assert segment.valid()
+    assert np.array_equal(segment.samples, ramp(2, 6))
+    buffer.write(ramp(8, 5))
+    assert not segment.valid()
+    with pytest.raises(IndexError):
+        segment.samples
+
+def test_segment_after_shares_the_buffer():
+    segment = AudioSegment.from_samples(ramp(0, 16000), 16000)
+    rest = segment.after(0.25)
+    assert rest.buffer is segment.buffer
+    assert rest.start == 4000
+    assert rest.duration == pytest.approx(0.75)
+
+def assert_utterance_spans(spans, sample_rate):
+    assert len(spans) == len(UTTERANCES)
+    for (start, end), (start_min, start_max, end_min, end_max) in zip(spans, UTTERANCES):
+        assert start_min <= start / sample_rate <= start_max
+        assert end_min <= end / sample_rate <= end_max
+
+def test_endpointer_splits_a_wav_into_utterances(fixture_wav):
+    samples, sample_rate = read_wav(fixture_wav("two_utterances.wav"))
+    endpointer = Endpointer(sample_rate)
+    chunk = int(sample_rate * 0.06)
+    spans = []
+    for position in range(0, len(samples), chunk):
+        spans.extend(endpointer.process(samples[position:position + chunk], position, 0))
+    spans.extend(endpointer.flush(len(samples)))
+    assert_utterance_spans(spans, sample_rate)
+
+def test_endpointer_finds_nothing_in_silence(fixture_wav):
+    samples, sample_rate = read_wav(fixture_wav("silence.wav"))
+    endpointer = Endpointer(sample_rate)
+    assert endpointer.process(samples, 0, 0) == []
+    assert endpointer.flush(len(samples)) == []
+
+def test_stream_emits_segments_from_a_wav_source(fixture_wav):
+    stream = AudioStream(WavFileSource(fixture_wav("two_utterances.wav")))
+    stream.start()
+    segments = []
+    while (segment := stream.next_segment(timeout=2)) is not None:
+        segments.append(segment)
+    stream.stop()
+    assert_utterance_spans([(s.start, s.end) for s in segments], stream.sample_rate)
+    assert all(segment.valid() for segment in segments)
+    assert stream.metrics()["segments"] == 2
+
+def test_small_ring_overwrites_unread_segments(fixture_wav):
+    # A 3 s ring no longer holds the first utterance once the whole 4.5 s file is read
+    stream = AudioStream(WavFileSource(fixture_wav("two_utterances.wav")), buffer_seconds=3)
+    stream.start()
+    stream.finished.wait(5)
+    first, second = stream.next_segment(timeout=1), stream.next_segment(timeout=1)
+    assert not first.valid()
+    assert second.valid()
+
+def test_continuous_listening_recognizes_in_capture_order(fixture_wav):
+    recognizer = ScriptedRecognizer(["first", "second"])
+    handler = SpeechHandler(recognizer_backend=recognizer, prewarm_phrases=False,
+                            audio_source=WavFileSource(fixture_wav("two_utterances.wav")))
+    handler.start_continuous_listening()
+    deadline = time.monotonic() + 5
+    results = []
+    while len(results) < 2 and time.monotonic() < deadline:
+        text = handler.get_speech_from_queue()
+        if text:
+            results.append(text)
+        else:
+            time.sleep(0.05)
+    handler.close()
+    assert results == ["first", "second"]
+    assert handler.pipeline_stats["captured"] == 2
@@ -0,0 +1,32 @@
+"""System commands reach the job scheduler only from interactive calls"""
+
+import pytest
+
+from modules.jarvis_ai import JarvisAI
+
+class RecordingScheduler:
+    """Stand-in scheduler that fails the test if a job is submitted"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, command, session_id=None):
+        self.submitted.append(command)
+        raise AssertionError("batch commands must not submit jobs")
+
+@pytest.fixture
+def scheduler():
+    return RecordingScheduler()
+
+def test_batches_never_submit_system_jobs(scheduler):
+    jarvis = JarvisAI(job_scheduler=scheduler)
+    responses, counts = jarvis.process_batch(["open calculator", "open notepad", "hello"])
+    assert scheduler.submitted == []
+    assert responses[0].startswith("Calculator would be opened")
+    assert counts["system"] == 2
+
+def test_interactive_system_commands_are_submitted(scheduler):
+    jarvis = JarvisAI(job_scheduler=scheduler)
+    with pytest.raises(AssertionError):
+        jarvis.process_command("open calculator", jarvis.session_context("s1"))
+    assert scheduler.submitted == ["open calculator"]
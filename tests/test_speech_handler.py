@@ -0,0 +1,61 @@
+"""VAD gating and WAV round trips through SpeechHandler, with a scripted stand-in recognizer"""
+
+import pytest
+
+from modules.recognizers import ScriptedRecognizer
+from modules.speech_handler import SpeechHandler
+from modules.voice_activity import VoiceActivityDetector, read_wav
+
+class RecordingRecognizer(ScriptedRecognizer):
+    """ScriptedRecognizer that also keeps the audio it was given"""
+
+    def __init__(self, transcripts=()):
+        super().__init__(transcripts)
+        self.audio = []
+
+    def recognize(self, audio):
+        self.audio.append(audio)
+        return super().recognize(audio)
+
+@pytest.fixture
+def recognizer():
+    return RecordingRecognizer(["what time is it", "tell me a joke"])
+
+@pytest.fixture
+def handler(recognizer):
+    return SpeechHandler(recognizer_backend=recognizer, prewarm_phrases=False)
+
+@pytest.mark.parametrize("name, expected", [
+    ("silence.wav", False),
+    ("command.wav", True),
+    ("other_word_1.wav", True),
+    ("wake_word_then_command.wav", True)
+])
+def test_vad_flags_speech(fixture_wav, name, expected):
+    assert VoiceActivityDetector().contains_speech(*read_wav(fixture_wav(name))) is expected
+
+def test_silence_is_gated_before_recognition(handler, recognizer, fixture_wav):
+    assert handler.transcribe_file(fixture_wav("silence.wav")) is None
+    assert recognizer.calls == 0
+
+def test_speech_is_passed_to_the_recognizer(handler, recognizer, fixture_wav):
+    assert handler.transcribe_file(fixture_wav("command.wav")) == "what time is it"
+    assert handler.transcribe_file(fixture_wav("other_word_1.wav")) == "tell me a joke"
+    assert recognizer.calls == 2
+
+def test_transcribe_file_round_trips_the_samples(handler, recognizer, fixture_wav):
+    samples, sample_rate = read_wav(fixture_wav("command.wav"))
+    handler.transcribe_file(fixture_wav("command.wav"))
+    audio = recognizer.audio[0]
+    assert audio.sample_rate == sample_rate
+    assert audio.sample_width == 2
+    assert audio.get_raw_data() == samples.tobytes()
+
+def test_unrecognized_speech_returns_none(handler, recognizer, fixture_wav):
+    recognizer.transcripts.clear()
+    assert handler.transcribe_file(fixture_wav("command.wav")) is None
+    assert recognizer.calls == 1
+
+def test_without_vad_silence_reaches_the_recognizer(recognizer, fixture_wav):
+    handler = SpeechHandler(recognizer_backend=recognizer, use_vad=False, prewarm_phrases=False)
+    assert handler.transcribe_file(fixture_wav("silence.wav")) == "what time is it"
@@ -0,0 +1,64 @@
+"""Offline wake-word enrollment and detection on the WAV fixtures"""
+
+import pytest
+
+from modules.voice_activity import read_wav
+from modules.wake_word import WakeWordGate, WakeWordSpotter
+
+ENROLLMENT = ["wake_word_1.wav", "wake_word_2.wav", "wake_word_3.wav"]
+NEGATIVES = ["command.wav", "other_word_1.wav", "other_word_2.wav", "silence.wav", "two_utterances.wav"]
+
+@pytest.fixture
+def spotter(tmp_path, fixture_wav):
+    spotter = WakeWordSpotter("jarvis", template_dir=tmp_path)
+    for name in ENROLLMENT:
+        spotter.enroll_wav(fixture_wav(name))
+    return spotter
+
+def test_enrollment_calibrates_a_threshold(spotter):
+    assert spotter.configured
+    assert len(spotter.templates) == len(ENROLLMENT)
+    assert 0 < spotter.threshold < float("inf")
+
+def test_detects_the_wake_word_and_where_it_ends(spotter, fixture_wav):
+    detected, end_seconds = spotter.detect_wav(fixture_wav("wake_word_then_command.wav"))
+    assert detected
+    # The fixture's wake word runs from 0.3 s to about 0.75 s; the command follows at 0.9 s
+    assert 0.6 < end_seconds < 0.9
+
+def test_no_false_accepts(spotter, fixture_wav):
+    false_accepts = [name for name in NEGATIVES if spotter.detect_wav(fixture_wav(name))[0]]
+    assert false_accepts == []
+    assert spotter.stats["detections"] == 0
+
+def test_templates_survive_save_and_load(spotter, tmp_path, fixture_wav):
+    spotter.save()
+    reloaded = WakeWordSpotter("jarvis", template_dir=tmp_path)
+    assert reloaded.configured
+    assert reloaded.threshold == pytest.approx(spotter.threshold)
+    assert reloaded.detect_wav(fixture_wav("wake_word_then_command.wav"))[0]
+
+def test_unenrolled_spotter_detects_nothing(tmp_path, fixture_wav):
+    spotter = WakeWordSpotter("friday", template_dir=tmp_path)
+    assert not spotter.configured
+    assert spotter.detect_wav(fixture_wav("wake_word_1.wav")) == (False, None)
+
+def test_gate_passes_the_command_spoken_with_the_wake_word(spotter, fixture_wav):
+    gate = WakeWordGate(spotter)
+    status, offset = gate.check(*read_wav(fixture_wav("wake_word_then_command.wav")), now=0.0)
+    assert status == "command"
+    assert 0.6 < offset < 0.9
+
+def test_gate_waits_for_the_command_after_a_bare_wake_word(spotter, fixture_wav):
+    gate = WakeWordGate(spotter, timeout=8.0)
+    command = read_wav(fixture_wav("command.wav"))
+    assert gate.check(*command, now=0.0) == ("rejected", None)
+    assert gate.check(*read_wav(fixture_wav("wake_word_1.wav")), now=1.0) == ("awake", None)
+    assert gate.check(*command, now=2.0) == ("follow_up", 0.0)
+    # One command per wake word
+    assert gate.check(*command, now=3.0) == ("rejected", None)
+
+def test_gate_falls_asleep_after_the_timeout(spotter, fixture_wav):
+    gate = WakeWordGate(spotter, timeout=8.0)
+    gate.check(*read_wav(fixture_wav("wake_word_1.wav")), now=0.0)
+    assert gate.check(*read_wav(fixture_wav("command.wav")), now=10.0) == ("rejected", None)